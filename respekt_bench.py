@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+"""
+Respekt benchmark - měření výkonu downloaderu
+Hlídá, že import a rychlé příkazy nenačítají těžké moduly a startují v milisekundách,
+a měří celý běh proti lokální náhradě webu a SMTP serveru
+"""
+
+import io
+import gzip
+import os
+import re
+import sys
+import json
+import math
+import time
+import random
+import shutil
+import zipfile
+import argparse
+import threading
+import statistics
+import subprocess
+import socketserver
+import tempfile
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DOWNLOADER = os.path.join(SCRIPT_DIR, 'respekt_downloader.py')
+
+# Moduly, které se smí načíst až ve fázi, která je potřebuje
+HEAVY_MODULES = ['selenium', 'webdriver_manager', 'requests', 'bs4', 'httpx', 'smtplib', 'asyncio', 'email.utils']
+
+# Spouští se v čistém interpretu, aby se nepočítaly moduly načtené benchmarkem
+IMPORT_PROBE = """
+import sys, json, time
+started = time.perf_counter()
+import respekt_downloader
+elapsed = time.perf_counter() - started
+loaded = [name for name in {heavy!r} if name in sys.modules and type(sys.modules[name]).__name__ != '_LazyModule']
+print(json.dumps({{'ms': elapsed * 1000, 'loaded': loaded}}))
+"""
+
+# Rychlé příkazy, které musí startovat bez těžkých modulů
+CLI_COMMANDS = [['--check-config'], ['--ledger']]
+
+def measure_import(runs):
+    """Změří import modulu v čistých interpretech, vrátí (časy v ms, načtené těžké moduly)"""
+    times, loaded = [], set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', IMPORT_PROBE.format(heavy=HEAVY_MODULES)],
+            cwd=SCRIPT_DIR, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        times.append(result['ms'])
+        loaded.update(result['loaded'])
+    return times, sorted(loaded)
+
+def measure_cli(args, runs, env):
+    """Změří celkovou dobu běhu příkazu včetně startu interpretu, vrátí časy v ms"""
+    times = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(runs):
+            started = time.perf_counter()
+            subprocess.run([sys.executable, DOWNLOADER] + args, cwd=workdir, env=env, capture_output=True)
+            times.append((time.perf_counter() - started) * 1000)
+    return times
+
+def bench_import(args):
+    """⏱️ Import a rychlé příkazy - selže při překročení limitu nebo načtení těžkého modulu"""
+    times, loaded = measure_import(args.runs)
+    median = statistics.median(times)
+    print(f"import respekt_downloader: medián {median:.1f} ms (min {min(times):.1f} ms, {args.runs} běhů)")
+    
+    with tempfile.TemporaryDirectory() as state_dir:
+        env = dict(os.environ, RESPEKT_STATE_DIR=state_dir)
+        baseline = statistics.median(measure_cli(['--help'], args.runs, env))
+        print(f"python respekt_downloader.py --help: medián {baseline:.0f} ms")
+        for command in CLI_COMMANDS:
+            cli_median = statistics.median(measure_cli(command, args.runs, env))
+            print(f"python respekt_downloader.py {' '.join(command)}: medián {cli_median:.0f} ms")
+    
+    ok = True
+    if loaded:
+        print(f"❌ Import načetl těžké moduly: {', '.join(loaded)}")
+        ok = False
+    if median > args.budget_ms:
+        print(f"❌ Import trvá {median:.1f} ms, limit je {args.budget_ms:g} ms")
+        ok = False
+    if ok:
+        print("✅ Import v limitu")
+    return ok
+
+# Přihlašovací údaje, kterými se downloader hlásí na lokální náhradu webu
+BENCH_LOGIN = 'bench@example.com'
+BENCH_PASSWORD = 'bench'
+BENCH_TOKEN = 'bench-token'
+SESSION_COOKIE = 'respekt_session'
+
+# Opakující se blok článku - stránky webu mají desítky kB HTML kolem odkazu na EPUB
+ARTICLE_HTML = ('<article class="issue-article"><h3><a href="/tydenik/clanek">Titulek článku</a></h3>'
+                '<p class="perex">Perex článku s pár větami textu, jak ho web zobrazuje v obsahu vydání.</p></article>\n')
+
+def percentile(values, percent):
+    """Percentil metodou nejbližšího pořadí"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+def make_epub(size):
+    """Vytvoří platný EPUB (ZIP s mimetype) o zhruba zadané velikosti"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr(zipfile.ZipInfo('mimetype'), 'application/epub+zip')
+        archive.writestr('OEBPS/content.bin', random.Random(size).randbytes(size))
+    return buffer.getvalue()
+
+def issue_id(year, number):
+    return f"{year:08x}-{number:04x}-4000-8000-{year * 100 + number:012x}"
+
+class FixtureSite:
+    """🧪 Náhrada respekt.cz - přihlášení, archiv, vydání a EPUB s nastavitelnou latencí a chybami"""
+    
+    def __init__(self, year, latest, epub_size=5_000_000, page_size=60_000,
+                 latency_ms=0.0, jitter=0.5, failure_rate=0.0, cut_rate=0.0, seed=None):
+        self.year = year
+        self.latest = latest
+        self.epub = make_epub(epub_size)
+        self.filler = ARTICLE_HTML * max(1, page_size // len(ARTICLE_HTML))
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.cut_rate = cut_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.bytes_sent = 0
+    
+    def published(self, year, number):
+        """Poslední vydané číslo ročníku - starší ročníky mají 52 čísel"""
+        last = self.latest if year == self.year else 52 if year < self.year else 0
+        return 1 <= number <= last
+    
+    def roll(self, rate):
+        with self.lock:
+            return self.random.random() < rate
+    
+    def delay(self):
+        if self.latency_ms > 0:
+            with self.lock:
+                factor = 1 + self.random.uniform(-self.jitter, self.jitter)
+            time.sleep(self.latency_ms * factor / 1000)
+    
+    def sent(self, size, failed=False):
+        with self.lock:
+            self.requests += 1
+            self.failures += failed
+            self.bytes_sent += size
+    
+    def start(self):
+        """Spustí server na volném portu ve vlákně, vrátí (server, základní URL)"""
+        server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+        server.daemon_threads = True
+        server.site = self
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Obsluha požadavků náhrady webu, stav drží FixtureSite na serveru"""
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def log_message(self, format, *args):
+        pass
+    
+    @property
+    def site(self):
+        return self.server.site
+    
+    def logged_in(self):
+        return f"{SESSION_COOKIE}=ok" in (self.headers.get('Cookie') or '')
+    
+    def respond(self, status, body, content_type='text/html; charset=utf-8', headers=(), cut=False):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        if cut:
+            # Spojení spadne uprostřed těla - klient musí navázat přes Range
+            body = body[:len(body) // 2]
+            self.close_connection = True
+        self.wfile.write(body)
+        self.site.sent(len(body), failed=cut or status >= 500)
+    
+    def page(self, title, content):
+        account = ('<a href="/uzivatel/odhlaseni">Odhlásit</a>' if self.logged_in()
+                   else '<a href="/uzivatel/prihlaseni">Přihlásit</a>')
+        return (f'<!DOCTYPE html><html lang="cs"><head><meta charset="utf-8"><title>{title}</title></head>'
+                f'<body><header>{account}</header><main>{content}</main>'
+                f'<section class="articles">{self.site.filler}</section></body></html>')
+    
+    def injected_failure(self):
+        """Zpoždění a náhodná chyba serveru před každou odpovědí"""
+        self.site.delay()
+        if self.site.roll(self.site.failure_rate):
+            self.respond(503, 'Service Unavailable', 'text/plain')
+            return True
+        return False
+    
+    def do_GET(self):
+        if self.injected_failure():
+            return
+        path = urlparse(self.path).path
+        
+        if path in ('', '/'):
+            return self.respond(200, self.page('Respekt | RESPEKT', '<h1>Respekt</h1>'))
+        
+        if path == '/uzivatel/prihlaseni':
+            form = (f'<form method="post" action="/uzivatel/prihlaseni">'
+                    f'<input type="hidden" name="_token" value="{BENCH_TOKEN}">'
+                    f'<input type="email" name="email"><input type="password" name="password">'
+                    f'<button type="submit" name="send" value="1">Přihlásit</button></form>')
+            return self.respond(200, self.page('Přihlášení | RESPEKT', form),
+                                headers=[('Set-Cookie', 'XSRF-TOKEN=bench; Path=/')])
+        
+        match = re.fullmatch(r'/tydenik/(\d+)/(\d+)', path)
+        if match:
+            year, number = int(match[1]), int(match[2])
+            if not self.site.published(year, number):
+                return self.respond(404, self.page('Stránka nenalezena | RESPEKT', '<h1>404</h1>'))
+            link = f'<a class="download" href="/api/downloadEPub?issueId={issue_id(year, number)}">Stáhnout EPUB</a>'
+            return self.respond(200, self.page(f'Respekt {number}/{year} | RESPEKT', link))
+        
+        match = re.fullmatch(r'/archiv/(\d+)', path)
+        if match:
+            year = int(match[1])
+            numbers = [number for number in range(52, 0, -1) if self.site.published(year, number)]
+            links = ''.join(f'<a href="/tydenik/{year}/{number}">Respekt {number}/{year}</a>' for number in numbers)
+            return self.respond(200, self.page(f'Archiv {year} | RESPEKT', links))
+        
+        if path == '/api/downloadEPub':
+            if not self.logged_in():
+                return self.respond(403, 'Forbidden', 'text/plain')
+            return self.send_epub()
+        
+        self.respond(404, self.page('Stránka nenalezena | RESPEKT', '<h1>404</h1>'))
+    
+    def send_epub(self):
+        epub = self.site.epub
+        offset = 0
+        range_match = re.fullmatch(r'bytes=(\d+)-', self.headers.get('Range') or '')
+        if range_match and int(range_match[1]) < len(epub):
+            offset = int(range_match[1])
+        headers = [('Accept-Ranges', 'bytes'), ('ETag', '"bench-epub"')]
+        if offset:
+            headers.append(('Content-Range', f"bytes {offset}-{len(epub) - 1}/{len(epub)}"))
+        cut = self.site.roll(self.site.cut_rate)
+        self.respond(206 if offset else 200, epub[offset:], 'application/epub+zip', headers, cut=cut)
+    
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        form = parse_qs(self.rfile.read(length).decode('utf-8'))
+        if self.injected_failure():
+            return
+        if (form.get('_token') == [BENCH_TOKEN] and form.get('email') == [BENCH_LOGIN]
+                and form.get('password') == [BENCH_PASSWORD]):
+            return self.respond(302, '', headers=[('Location', '/'),
+                                                  ('Set-Cookie', f"{SESSION_COOKIE}=ok; Path=/; Max-Age=86400")])
+        self.respond(200, self.page('Přihlášení | RESPEKT', '<p class="error">Neplatné přihlašovací údaje</p>'))
+
+class SmtpSink(socketserver.StreamRequestHandler):
+    """📭 Minimální SMTP server - přijme AUTH i zprávy, STARTTLS nenabízí, chyby jde vstřikovat"""
+    
+    def reply(self, line):
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+    
+    def handle(self):
+        sink = self.server
+        self.reply('220 respekt-bench ESMTP')
+        data = None
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            if data is not None:
+                if line != b'.\r\n':
+                    data += len(line)
+                    continue
+                with sink.lock:
+                    failed = sink.random.random() < sink.failure_rate
+                    if not failed:
+                        sink.messages += 1
+                        sink.bytes_received += data
+                data = None
+                self.reply('451 Temporary failure' if failed else '250 OK queued')
+                continue
+            
+            command = line.decode('ascii', 'replace').strip().upper()
+            if command.startswith(('EHLO', 'HELO')):
+                self.reply('250-respekt-bench')
+                self.reply('250-AUTH PLAIN LOGIN')
+                self.reply('250 8BITMIME')
+            elif command.startswith('AUTH'):
+                self.reply('235 Authentication successful')
+            elif command == 'DATA':
+                data = 0
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+def start_smtp_sink(failure_rate=0.0, seed=None):
+    """Spustí SMTP sink na volném portu ve vlákně"""
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), SmtpSink)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.random = random.Random(seed)
+    server.failure_rate = failure_rate
+    server.messages = 0
+    server.bytes_received = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def run_downloader(workdir, env):
+    """Spustí downloader jako podproces, vrátí (exit kód, doba v ms, špičkové RSS v MB)"""
+    with open(os.path.join(workdir, 'output.log'), 'ab') as output:
+        started = time.perf_counter()
+        process = subprocess.Popen([sys.executable, DOWNLOADER], cwd=workdir, env=env,
+                                   stdout=output, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = (time.perf_counter() - started) * 1000
+    # ru_maxrss je na Linuxu v kB, na macOS v bajtech
+    peak_rss = usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+    return os.waitstatus_to_exitcode(status), elapsed, peak_rss
+
+def summarize(samples):
+    return {'p50': round(percentile(samples, 50), 1), 'p95': round(percentile(samples, 95), 1),
+            'max': round(max(samples), 1), 'count': len(samples)}
+
+def bench_e2e(args):
+    """🏁 Celý běh downloaderu proti lokální náhradě webu a SMTP - p50/p95 fází, RSS a přenesená data"""
+    sys.path.insert(0, SCRIPT_DIR)
+    from respekt_downloader import predict_issue
+    
+    smtp_server = start_smtp_sink(args.smtp_failure_rate, args.seed)
+    site = http_server = None
+    if args.cassette:
+        # Odpovědi přehrává downloader sám z kazety, web se nespouští
+        with gzip.open(args.cassette, 'rt', encoding='utf-8') as f:
+            base_url = json.load(f)['base_url']
+        print(f"📼 Přehrávám kazetu {args.cassette} ({base_url}), SMTP 127.0.0.1:{smtp_server.server_address[1]}")
+    else:
+        year, latest = predict_issue()
+        site = FixtureSite(year, args.latest or latest, epub_size=int(args.epub_mb * 1_000_000),
+                           page_size=int(args.page_kb * 1000), latency_ms=args.latency_ms, jitter=args.jitter,
+                           failure_rate=args.failure_rate, cut_rate=args.cut_rate, seed=args.seed)
+        http_server, base_url = site.start()
+        print(f"🧪 Náhrada webu {base_url}, SMTP 127.0.0.1:{smtp_server.server_address[1]}, "
+              f"vydání {site.latest}/{year}, EPUB {len(site.epub) / 1e6:.1f} MB, latence {args.latency_ms:g} ms")
+    
+    workroot = tempfile.mkdtemp(prefix='respekt-bench-')
+    shared_state = os.path.join(workroot, 'state')
+    runs = []
+    try:
+        for index in range(args.runs):
+            workdir = os.path.join(workroot, f"run-{index + 1}")
+            os.makedirs(workdir)
+            metrics_file = os.path.join(workdir, 'metrics.json')
+            env = dict(os.environ,
+                       RESPEKT_BASE_URL=base_url,
+                       RESPEKT_SESSION_PROBE_URL=base_url,
+                       RESPEKT_LOGIN_MODE='http',
+                       RESPEKT_LOGIN=BENCH_LOGIN,
+                       RESPEKT_PASSWORD=BENCH_PASSWORD,
+                       GMAIL_EMAIL='bench@localhost',
+                       GMAIL_APP_PASSWORD='bench',
+                       KINDLE_EMAIL='kindle@localhost',
+                       SMTP_HOST='127.0.0.1',
+                       SMTP_PORT=str(smtp_server.server_address[1]),
+                       RESPEKT_SMTP_STARTTLS='0',
+                       RESPEKT_STATE_DIR=shared_state if args.warm else os.path.join(workdir, 'state'),
+                       RESPEKT_METRICS_FILE=metrics_file)
+            if args.cassette:
+                env['RESPEKT_REPLAY'] = os.path.abspath(args.cassette)
+            
+            bytes_before = site.bytes_sent if site else 0
+            exit_code, elapsed, peak_rss = run_downloader(workdir, env)
+            metrics = {}
+            if os.path.exists(metrics_file):
+                with open(metrics_file, encoding='utf-8') as f:
+                    metrics = json.load(f)
+            run = {
+                'exit_code': exit_code,
+                'wall_ms': round(elapsed, 1),
+                'peak_rss_mb': round(peak_rss, 1),
+                'server_bytes_sent': site.bytes_sent - bytes_before if site else 0,
+                'client_bytes_received': metrics.get('http', {}).get('bytes_received', 0),
+                'http_requests': metrics.get('http', {}).get('requests', 0),
+                'phases': {name: phase['total_ms'] for name, phase in metrics.get('phases', {}).items()}
+            }
+            runs.append(run)
+            status = '✅' if exit_code == 0 else f"❌ (exit {exit_code}, log {workdir}/output.log)"
+            print(f"  běh {index + 1}/{args.runs}: {elapsed:.0f} ms, RSS {peak_rss:.0f} MB, "
+                  f"{run['server_bytes_sent'] / 1e6:.2f} MB {status}")
+            
+            # V teplém režimu vyjde před dalším během nové číslo, jinak by nebylo co stahovat
+            if args.warm and site:
+                site.latest += 1
+    finally:
+        if http_server:
+            http_server.shutdown()
+        smtp_server.shutdown()
+        if args.keep:
+            print(f"📁 Pracovní adresáře běhů: {workroot}")
+        else:
+            shutil.rmtree(workroot, ignore_errors=True)
+    
+    phase_names = sorted({name for run in runs for name in run['phases']})
+    results = {
+        'config': {key: value for key, value in vars(args).items() if key != 'handler'},
+        'runs': runs,
+        'failed_runs': sum(run['exit_code'] != 0 for run in runs),
+        'wall_ms': summarize([run['wall_ms'] for run in runs]),
+        'peak_rss_mb': summarize([run['peak_rss_mb'] for run in runs]),
+        'server_bytes_sent': summarize([run['server_bytes_sent'] for run in runs]),
+        'client_bytes_received': summarize([run['client_bytes_received'] for run in runs]),
+        'phases': {name: summarize([run['phases'].get(name, 0.0) for run in runs]) for name in phase_names},
+        'server': {'requests': site.requests if site else 0, 'injected_failures': site.failures if site else 0},
+        'smtp': {'messages': smtp_server.messages, 'bytes_received': smtp_server.bytes_received}
+    }
+    
+    print(f"\n{'fáze':<20}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, stats in [('celý běh', results['wall_ms'])] + list(results['phases'].items()):
+        print(f"{name:<20}{stats['p50']:>10.0f}{stats['p95']:>10.0f}")
+    print(f"RSS špička: p50 {results['peak_rss_mb']['p50']:.0f} MB, max {results['peak_rss_mb']['max']:.0f} MB")
+    print(f"Přeneseno: server {results['server_bytes_sent']['p50'] / 1e6:.2f} MB, "
+          f"klient {results['client_bytes_received']['p50'] / 1e6:.2f} MB na běh (p50)")
+    print(f"SMTP: {results['smtp']['messages']} zpráv, vstříknuté chyby serveru: {results['server']['injected_failures']}")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"💾 Výsledky uloženy do {args.output}")
+    
+    # Se vstříknutými chybami smí běh selhat - měří se, jak dlouho se s nimi vyrovná
+    ok = results['failed_runs'] == 0 or max(args.failure_rate, args.cut_rate, args.smtp_failure_rate) > 0
+    if not ok:
+        print(f"❌ Neúspěšné běhy: {results['failed_runs']}/{len(runs)}")
+    if args.baseline:
+        ok = compare_baseline(results, args.baseline, args.tolerance) and ok
+    return ok
+
+def compare_baseline(results, path, tolerance):
+    """Porovná p50 fází s uloženými výsledky - selže, když je některá pomalejší o víc než toleranci"""
+    with open(path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    
+    compared = [('celý běh', results['wall_ms'], baseline.get('wall_ms'))]
+    compared += [(name, stats, baseline.get('phases', {}).get(name)) for name, stats in results['phases'].items()]
+    ok = True
+    for name, current, previous in compared:
+        if not previous:
+            continue
+        # Drobné výkyvy v jednotkách ms nejsou regrese, ani když jsou procentuálně velké
+        limit = max(previous['p50'] * (1 + tolerance), previous['p50'] + 20)
+        if current['p50'] > limit:
+            print(f"❌ Regrese {name}: p50 {current['p50']:.0f} ms, baseline {previous['p50']:.0f} ms")
+            ok = False
+    if ok:
+        print(f"✅ Bez regrese proti {path} (tolerance {tolerance:.0%})")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarky Respekt downloaderu")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    import_parser = commands.add_parser('import', help="doba importu a startu rychlých příkazů")
+    import_parser.add_argument('--runs', type=int, default=5, help="počet měření (výchozí 5)")
+    import_parser.add_argument('--budget-ms', type=float, default=float(os.getenv('RESPEKT_IMPORT_BUDGET_MS', '100')),
+                               help="maximální medián doby importu v ms (výchozí 100)")
+    import_parser.set_defaults(handler=bench_import)
+    
+    e2e_parser = commands.add_parser('e2e', help="celý běh proti lokální náhradě webu a SMTP serveru")
+    e2e_parser.add_argument('--runs', type=int, default=5, help="počet běhů (výchozí 5)")
+    e2e_parser.add_argument('--warm', action='store_true',
+                            help="sdílený stav mezi běhy (session, index), každý běh vyjde nové číslo")
+    e2e_parser.add_argument('--latest', type=int, help="poslední vydané číslo (výchozí podle kalendáře)")
+    e2e_parser.add_argument('--latency-ms', type=float, default=0.0, help="zpoždění každé odpovědi serveru v ms")
+    e2e_parser.add_argument('--jitter', type=float, default=0.5, help="náhodný rozptyl zpoždění (podíl, výchozí 0.5)")
+    e2e_parser.add_argument('--failure-rate', type=float, default=0.0, help="podíl odpovědí 503 (0-1)")
+    e2e_parser.add_argument('--cut-rate', type=float, default=0.0, help="podíl stahování EPUB přerušených v půlce (0-1)")
+    e2e_parser.add_argument('--smtp-failure-rate', type=float, default=0.0, help="podíl zpráv odmítnutých SMTP (0-1)")
+    e2e_parser.add_argument('--epub-mb', type=float, default=5.0, help="velikost EPUB v MB (výchozí 5)")
+    e2e_parser.add_argument('--page-kb', type=float, default=60.0, help="velikost HTML stránek v kB (výchozí 60)")
+    e2e_parser.add_argument('--seed', type=int, help="seed náhodných chyb a zpoždění")
+    e2e_parser.add_argument('--output', help="uloží výsledky do JSON souboru")
+    e2e_parser.add_argument('--baseline', help="porovná p50 fází s dříve uloženými výsledky")
+    e2e_parser.add_argument('--tolerance', type=float, default=0.25,
+                            help="povolené zpomalení proti baseline (podíl, výchozí 0.25)")
+    e2e_parser.add_argument('--cassette', help="místo náhrady webu přehraje kazetu nahranou přes --record")
+    e2e_parser.add_argument('--keep', action='store_true', help="ponechá pracovní adresáře a logy běhů")
+    e2e_parser.set_defaults(handler=bench_e2e)
+    
+    args = parser.parse_args()
+    if not args.handler(args):
+        exit(1)
+
+if __name__ == "__main__":
+    main()
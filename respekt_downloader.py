@@ -6,59 +6,1907 @@ Build: 20250825
 """
 
 import os
+import sys
+import json
+import struct
+import hashlib
+import base64
+import gzip
+import io
+import uuid
+import glob
+import random
+import shutil
 import time
-import smtplib
-import requests
+import tempfile
 import re
-from datetime import datetime, timedelta
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
+import html
+import argparse
+import abc
+import collections
+import contextlib
+import contextvars
+import functools
+import importlib.util
+import signal
+import threading
+import types
+from datetime import date, datetime, timedelta
+from urllib.parse import urljoin, urlparse
 import logging
 
+def lazy_import(name):
+    """Modul se načte až při prvním přístupu k jeho atributu, nenainstalovaný vrátí None"""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        return None
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+# Těžké moduly se načtou až ve fázi, která je potřebuje - rychlé příkazy (kontrola
+# konfigurace, výpis záznamů, odeslání fronty) je vůbec nenačítají. Selenium a
+# webdriver_manager se importují až při spuštění prohlížeče.
+asyncio = lazy_import('asyncio')
+requests = lazy_import('requests')
+smtplib = lazy_import('smtplib')
+subprocess = lazy_import('subprocess')
+bs4 = lazy_import('bs4')
+# Bez httpx běží asynchronní vrstva nad requests session ve vláknech
+httpx = lazy_import('httpx')
+
 # Konfigurace
 RESPEKT_LOGIN = os.getenv('RESPEKT_LOGIN')
 RESPEKT_PASSWORD = os.getenv('RESPEKT_PASSWORD')
 GMAIL_EMAIL = os.getenv('GMAIL_EMAIL')
 GMAIL_APP_PASSWORD = os.getenv('GMAIL_APP_PASSWORD')
 KINDLE_EMAIL = os.getenv('KINDLE_EMAIL')
+# KINDLE_EMAIL může obsahovat více adres oddělených čárkou, středníkem nebo mezerou
+KINDLE_RECIPIENTS = [address for address in re.split(r'[,;\s]+', KINDLE_EMAIL or '') if address]
+
+# Režim přihlášení: auto (HTTP, při selhání Selenium), http, browser
+LOGIN_MODE = os.getenv('RESPEKT_LOGIN_MODE', 'auto').lower()
+
+# Adresu webu jde přesměrovat na lokální náhradu (benchmark, záznam provozu)
+BASE_URL = os.getenv('RESPEKT_BASE_URL', "https://www.respekt.cz").rstrip('/')
+LOGIN_URL = f"{BASE_URL}/uzivatel/prihlaseni"
+USER_AGENT = 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+HTTP_TIMEOUT = 30
+# Počet souběžných HTTP požadavků při zkoušení čísel vydání
+PROBE_WORKERS = int(os.getenv('RESPEKT_PROBE_WORKERS', '8'))
+# Opakování ověření vydání po chybě (5xx, timeout) - chyba nesmí znamenat "vydání neexistuje"
+PROBE_RETRIES = int(os.getenv('RESPEKT_PROBE_RETRIES', '2'))
+# Stahování EPUB po částech, s navázáním po přerušeném spojení
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_RETRIES = int(os.getenv('RESPEKT_DOWNLOAD_RETRIES', '3'))
+# HTTP/2 přes httpx, pokud je nainstalován balíček h2
+HTTP2_ENABLED = os.getenv('RESPEKT_HTTP2', '1') == '1' and importlib.util.find_spec('h2') is not None
+
+SMTP_HOST = os.getenv('SMTP_HOST', 'smtp.gmail.com')
+SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
+# STARTTLS jde vypnout jen pro lokální SMTP server (benchmark)
+SMTP_STARTTLS = os.getenv('RESPEKT_SMTP_STARTTLS', '1') == '1'
+# Při přehrávání kazety se pošta smí odeslat jen na lokální server
+LOOPBACK_HOSTS = {'localhost', '127.0.0.1', '::1'}
+# Příloha se kóduje po blocích - násobek 57 bytů dává celé 76znakové base64 řádky
+MIME_READ_SIZE = 57 * 1024
+
+# Značky v HTML, které vidí jen přihlášený uživatel
+LOGGED_IN_MARKERS = ['/uzivatel/odhlaseni', 'odhlaseni', 'Odhlásit', 'muj-ucet']
+
+# Formát odkazů na vydání a na stažení EPUB přes API
+ISSUE_URL_PATTERN = re.compile(r'/tydenik/(\d{4})/(\d+)')
+ISSUE_ID_PATTERN = re.compile(r'/api/downloadEPub\?issueId=([a-f0-9-]+)')
+
+# Stav mezi běhy (session, cache) - v GitHub Actions se přenáší přes actions/cache
+STATE_DIR = os.getenv('RESPEKT_STATE_DIR', '.respekt_state')
+SESSION_FILE = os.path.join(STATE_DIR, 'session.json')
+SESSION_PROBE_URL = os.getenv('RESPEKT_SESSION_PROBE_URL', BASE_URL)
+# Uložená session starší než tento limit se ani nezkouší
+SESSION_MAX_AGE = timedelta(days=int(os.getenv('RESPEKT_SESSION_MAX_AGE_DAYS', '14')))
+
+# Den v týdnu, kdy vychází nové číslo (0 = pondělí, 6 = neděle)
+PUBLICATION_WEEKDAY = int(os.getenv('RESPEKT_PUBLICATION_WEEKDAY', '6'))
+# Pojistka proti nekonečnému hledání, pokud by web odpovídal na jakékoli číslo
+MAX_ISSUES_PER_YEAR = 60
+ISSUE_CACHE_FILE = os.path.join(STATE_DIR, 'last_issue.json')
+ISSUE_INDEX_FILE = os.path.join(STATE_DIR, 'issue_index.json')
+LEDGER_FILE = os.path.join(STATE_DIR, 'ledger.json')
+
+# Strategie hledání aktuálního vydání závodí souběžně, každá má vlastní časový limit
+# v sekundách, přepsatelný přes RESPEKT_DISCOVERY_<STRATEGIE>
+DISCOVERY_TIMEOUTS = {
+    'predicted': 10,
+    'cached': 10,
+    'archive': 15,
+    'direct': 45
+}
+DISCOVERY_TIMEOUTS = {
+    name: float(os.getenv(f'RESPEKT_DISCOVERY_{name.upper()}', default))
+    for name, default in DISCOVERY_TIMEOUTS.items()
+}
+DISCOVERY_STATS_FILE = os.path.join(STATE_DIR, 'discovery_stats.json')
+
+# Režim démona (--daemon): kontroly soustředěné kolem očekávaného vydání nového čísla
+PUBLICATION_TIME = os.getenv('RESPEKT_PUBLICATION_TIME', '06:00')
+# Kontroly začínají s předstihem a po vydání běží v kratším intervalu po celé okno
+DAEMON_LEAD = timedelta(minutes=int(os.getenv('RESPEKT_DAEMON_LEAD_MINUTES', '30')))
+DAEMON_WINDOW = timedelta(hours=int(os.getenv('RESPEKT_DAEMON_WINDOW_HOURS', '48')))
+DAEMON_POLL_INTERVAL = timedelta(minutes=int(os.getenv('RESPEKT_DAEMON_POLL_MINUTES', '10')))
+DAEMON_IDLE_INTERVAL = timedelta(hours=int(os.getenv('RESPEKT_DAEMON_IDLE_HOURS', '6')))
+DAEMON_STATUS_FILE = os.path.join(STATE_DIR, 'daemon.json')
+
+# Fronta doručení - stažená vydání čekají na odeslání odděleně od stahování
+OUTBOX_DIR = os.path.join(STATE_DIR, 'outbox')
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('RESPEKT_OUTBOX_MAX_ATTEMPTS', '8'))
+OUTBOX_BACKOFF_BASE = 15
+OUTBOX_BACKOFF_CAP = 3600
+# Jak dlouho smí jeden běh čekat na další pokus o doručení
+OUTBOX_INLINE_WAIT = float(os.getenv('RESPEKT_OUTBOX_INLINE_WAIT', '300'))
+
+# Hromadné stahování archivu
+ARCHIVE_DIR = os.getenv('RESPEKT_ARCHIVE_DIR', 'archiv')
+ARCHIVE_WORKERS = int(os.getenv('RESPEKT_ARCHIVE_WORKERS', '4'))
+# Maximální počet požadavků za sekundu na jeden host
+ARCHIVE_RATE = float(os.getenv('RESPEKT_ARCHIVE_RATE', '2'))
+
+# Horní limity čekání v sekundách pro jednotlivé fáze, přepsatelné přes RESPEKT_WAIT_<FÁZE>
+WAIT_TIMEOUTS = {
+    'page_load': 15,
+    'login_form': 10,
+    'login_submit': 15,
+    'network_idle': 5,
+    'archive': 15,
+    'issue_page': 15
+}
+WAIT_TIMEOUTS = {
+    phase: float(os.getenv(f'RESPEKT_WAIT_{phase.upper()}', default))
+    for phase, default in WAIT_TIMEOUTS.items()
+}
+WAIT_POLL_INTERVAL = 0.2
+# Jak dlouho stránka nesmí stahovat nic nového, aby byla síť považována za klidnou
+NETWORK_IDLE_QUIET = 0.5
+
+# ChromeDriver se drží v adresáři stavu podle hlavní verze Chrome, další běhy ho nestahují
+CHROMEDRIVER_DIR = os.path.join(STATE_DIR, 'chromedriver')
+CHROMEDRIVER_CACHE_FILE = os.path.join(STATE_DIR, 'chromedriver.json')
+CHROME_BINARIES = [os.getenv('RESPEKT_CHROME_BINARY', 'google-chrome'), 'google-chrome-stable', 'chromium', 'chromium-browser']
+
+# Požadavky, které prohlížeč vůbec nestáhne (DevTools Network.setBlockedURLs):
+# typy zdrojů podle přípony URL a měřicí/reklamní hosty, přepsatelné přes
+# RESPEKT_BLOCK_TYPES a RESPEKT_BLOCK_HOSTS (čárkou oddělené, prázdné = nic)
+BLOCKED_RESOURCE_PATTERNS = {
+    'Image': ['*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.avif*', '*.svg*', '*.ico*'],
+    'Media': ['*.mp4*', '*.webm*', '*.mp3*', '*.m3u8*'],
+    'Font': ['*.woff*', '*.woff2*', '*.ttf*', '*.otf*', '*.eot*'],
+    'Stylesheet': ['*.css*']
+}
+BLOCKED_RESOURCE_TYPES = [name for name in re.split(r'[,\s]+', os.getenv('RESPEKT_BLOCK_TYPES', 'Image,Media,Font,Stylesheet')) if name]
+BLOCKED_HOSTS = [host for host in re.split(r'[,\s]+', os.getenv(
+    'RESPEKT_BLOCK_HOSTS',
+    'googletagmanager.com,google-analytics.com,doubleclick.net,googlesyndication.com,'
+    'facebook.net,connect.facebook.net,hotjar.com,gemius.pl,cpex.cz,imedia.cz,ssp.seznam.cz'
+)) if host]
+
+# Statistiky selektorů - úspěšné se zkoušejí jako první, neúspěšné rychle ztrácejí skóre
+SELECTOR_STATS_FILE = os.path.join(STATE_DIR, 'selector_stats.json')
+SELECTOR_HIT_DECAY = 0.8
+SELECTOR_MISS_DECAY = 0.5
+
+# Zachycení stavu stránek při chybách: kolik posledních stavů držet v paměti
+# a kvalita JPEG screenshotu (0 = bez screenshotu); na disk jen při neúspěchu
+DEBUG_CAPTURE_KEEP = int(os.getenv('RESPEKT_DEBUG_KEEP', '5'))
+DEBUG_SCREENSHOT_QUALITY = int(os.getenv('RESPEKT_DEBUG_SCREENSHOT_QUALITY', '60'))
+DEBUG_INDEX_FILE = 'debug_states.json'
+
+# Log: na konzoli text, do souboru JSON řádky s rotací podle velikosti (starší soubory v .gz)
+LOG_FILE = os.getenv('RESPEKT_LOG_FILE', 'respekt.log')
+LOG_MAX_BYTES = int(os.getenv('RESPEKT_LOG_MAX_BYTES', str(5 * 1024 * 1024)))
+LOG_BACKUPS = int(os.getenv('RESPEKT_LOG_BACKUPS', '5'))
+# Úroveň HTML výpisů: INFO = začátek neočekávané odpovědi, DEBUG = i celý DOM zachycených stavů
+HTML_LOG_LEVEL = os.getenv('RESPEKT_HTML_LOG_LEVEL', 'INFO').upper()
+
+# Strojově čitelné metriky běhu (fáze, WebDriver příkazy, HTTP požadavky) vedle logu
+METRICS_FILE = os.getenv('RESPEKT_METRICS_FILE', 'respekt_metrics.json')
+
+# Kazeta s HTTP provozem: nahrání běhu (record) a jeho přehrání bez sítě (replay)
+# Jen pro lokální ladění - kazeta obsahuje placený EPUB i přihlášené stránky
+RECORD_CASSETTE = os.getenv('RESPEKT_RECORD') or None
+REPLAY_CASSETTE = os.getenv('RESPEKT_REPLAY') or None
+
+# Proměnné prostředí, bez kterých běh nemá smysl spouštět
+REQUIRED_VARS = ['RESPEKT_LOGIN', 'RESPEKT_PASSWORD', 'GMAIL_EMAIL', 'GMAIL_APP_PASSWORD', 'KINDLE_EMAIL']
 
-# Nastavení logování
-logging.basicConfig(
-    level=logging.INFO, 
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('respekt.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
+# Výpisy HTML (hlavička neočekávané odpovědi, DOM zachycených stavů) mají vlastní úroveň
+html_logger = logging.getLogger(f"{__name__}.html")
 
-class RespektDownloader:
+# Aktivní span běhu a jeho začátek (perf_counter) - čte ho Tracer i logování
+ACTIVE_SPAN = contextvars.ContextVar('respekt_span', default=None)
+
+class LogContextFilter(logging.Filter):
+    """Doplní záznamu fázi běhu a dobu strávenou v ní - běží ve vlákně, které loguje"""
+    
+    def filter(self, record):
+        active = ACTIVE_SPAN.get()
+        record.phase = active[0]['name'] if active else None
+        record.phase_ms = round((time.perf_counter() - active[1]) * 1000, 1) if active else None
+        return True
+
+class JsonLogFormatter(logging.Formatter):
+    """Jeden JSON objekt na řádek: čas, úroveň, vlákno, fáze běhu a časování"""
+    
+    def format(self, record):
+        return json.dumps({
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'elapsed_ms': round(record.relativeCreated, 1),
+            'phase': getattr(record, 'phase', None),
+            'phase_ms': getattr(record, 'phase_ms', None),
+            'message': record.getMessage()
+        }, ensure_ascii=False)
+
+def gzip_rotator(source, dest):
+    """Rotovaný log se rovnou zkomprimuje (respekt.log.1.gz)"""
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+def setup_logging():
+    """Nastaví neblokující logování - volá se z main(), ne při importu
+    
+    Logující vlákno jen vloží záznam do fronty, formátování, zápis na konzoli
+    i do souboru (JSON řádky, rotace podle velikosti s kompresí) dělá vlákno QueueListener.
+    """
+    import atexit
+    import queue
+    import logging.handlers
+    
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    
+    log_file = logging.handlers.RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS,
+                                                    encoding='utf-8', delay=True)
+    log_file.namer = lambda name: f"{name}.gz"
+    log_file.rotator = gzip_rotator
+    log_file.setFormatter(JsonLogFormatter())
+    
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(LogContextFilter())
+    listener = logging.handlers.QueueListener(log_queue, console, log_file, respect_handler_level=True)
+    
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.handlers = [queue_handler]
+    listener.start()
+    # Při ukončení se vypíše, co ve frontě zbylo
+    atexit.register(listener.stop)
+    
+    html_logger.setLevel(HTML_LOG_LEVEL)
+    # httpx loguje každý požadavek na úrovni INFO
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+
+def missing_config():
+    """Vrátí chybějící povinné proměnné prostředí"""
+    return [var for var in REQUIRED_VARS if not os.getenv(var)]
+
+def load_state(path, default=None):
+    """Načte JSON stav z disku, při chybě vrátí výchozí hodnotu"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Stav {path} nelze načíst: {e}")
+        return default
+
+def save_state(path, data):
+    """Atomicky zapíše JSON stav na disk (soubor je čitelný jen pro vlastníka)"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def epub_header_problem(head):
+    """Zkontroluje začátek souboru (ZIP hlavička + mimetype), vrátí popis problému nebo None"""
+    if len(head) < 30 or head[:4] != b'PK\x03\x04':
+        return "soubor nezačíná ZIP hlavičkou"
+    
+    name_length, extra_length = struct.unpack('<HH', head[26:30])
+    name = head[30:30 + name_length]
+    if name != b'mimetype':
+        return f"první soubor v archivu je {name!r}, ne mimetype"
+    
+    content_start = 30 + name_length + extra_length
+    if head[content_start:content_start + 20] != b'application/epub+zip':
+        return "mimetype není application/epub+zip"
+    
+    return None
+
+class EpubWriter:
+    """✍️ Zapisuje stahovaný EPUB do dočasného .part souboru
+    
+    Během zápisu počítá SHA-256 a kontroluje EPUB hlavičku, po přerušení
+    umí navázat přes HTTP Range. Hotový soubor se na místo přesune atomicky.
+    """
+    
+    def __init__(self, filename):
+        self.filename = filename
+        self.part_path = f"{filename}.part"
+        self.file = open(self.part_path, 'wb')
+        self._reset()
+    
+    def _reset(self):
+        self.digest = hashlib.sha256()
+        self.written = 0
+        self.head = b''
+        self.header_checked = False
+    
+    def request_headers(self, headers):
+        """Při navazování přidá k hlavičkám požadavku Range"""
+        headers = dict(headers or {})
+        if self.written:
+            headers['Range'] = f'bytes={self.written}-'
+        return headers
+    
+    def start_response(self, status_code, content_range):
+        """Pokud server nenavázal na přerušené místo, začne soubor znovu od začátku"""
+        if self.written and not (status_code == 206 and content_range.startswith(f'bytes {self.written}-')):
+            logger.info("🔁 Server nenavázal na přerušené místo, stahuji znovu od začátku")
+            self.file.seek(0)
+            self.file.truncate()
+            self._reset()
+    
+    def write(self, chunk):
+        self.file.write(chunk)
+        self.digest.update(chunk)
+        self.written += len(chunk)
+        
+        # Hlavičku zkontroluj hned z prvních bytů, ne až po stažení
+        if not self.header_checked:
+            self.head += chunk[:512 - len(self.head)]
+            if len(self.head) >= 512:
+                self._check_header()
+    
+    def _check_header(self):
+        """Odmítne odpověď, která není ZIP (typicky chybová HTML stránka); jiný mimetype jen zaloguje"""
+        self.header_checked = True
+        problem = epub_header_problem(self.head)
+        if problem is None:
+            return
+        if not self.head.startswith(b'PK\x03\x04'):
+            html_logger.info(f"Response: {self.head[:500].decode('utf-8', errors='replace')}")
+            raise ValueError(f"Stažená data nejsou EPUB: {problem}")
+        logger.warning(f"⚠️ Neobvyklý EPUB: {problem}")
+    
+    def finish(self):
+        """Dokončí soubor a přesune ho na místo, vrátí (velikost, sha256)"""
+        if not self.header_checked:
+            self._check_header()
+        
+        if self.written < 1000:
+            logger.warning(f"⚠️ Podezřele malý soubor ({self.written} bytes)")
+        
+        self.file.close()
+        os.replace(self.part_path, self.filename)
+        return self.written, self.digest.hexdigest()
+    
+    def discard(self):
+        """Uklidí nedokončený .part soubor"""
+        self.file.close()
+        if os.path.exists(self.part_path):
+            os.remove(self.part_path)
+
+def stream_download(session, url, filename, headers=None):
+    """⬇️ Stáhne soubor po částech přes requests session, vrátí (velikost, sha256)"""
+    writer = EpubWriter(filename)
+    try:
+        for attempt in range(1, DOWNLOAD_RETRIES + 2):
+            try:
+                with session.get(url, headers=writer.request_headers(headers), stream=True, timeout=HTTP_TIMEOUT) as response:
+                    response.raise_for_status()
+                    writer.start_response(response.status_code, response.headers.get('Content-Range', ''))
+                    for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                        writer.write(chunk)
+                break
+            
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+                if attempt > DOWNLOAD_RETRIES:
+                    raise
+                logger.warning(f"⚠️ Stahování přerušeno po {writer.written} bytes ({e}), navazuji ({attempt}/{DOWNLOAD_RETRIES})...")
+                time.sleep(attempt)
+        
+        return writer.finish()
+    
+    finally:
+        writer.discard()
+
+def installed_chrome_version():
+    """Zjistí verzi nainstalovaného Chrome (např. '120.0.6099.109'), nebo None"""
+    for binary in CHROME_BINARIES:
+        path = shutil.which(binary)
+        if not path:
+            continue
+        try:
+            output = subprocess.run([path, '--version'], capture_output=True, text=True, timeout=10).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        match = re.search(r'\d+\.\d+\.\d+\.\d+', output)
+        if match:
+            return match.group(0)
+    return None
+
+def resolve_chromedriver():
+    """🚗 Vrátí cestu k ChromeDriveru pro nainstalovaný Chrome
+    
+    Driver z cache pro stejnou hlavní verzi Chrome se použije bez síťového dotazu.
+    Když stažení selže (offline), vezme se poslední driver z cache; bez cache vrátí
+    None a driver dohledá Selenium Manager.
+    """
+    from webdriver_manager.chrome import ChromeDriverManager
+    
+    version = installed_chrome_version()
+    major = version.split('.')[0] if version else None
+    cache = load_state(CHROMEDRIVER_CACHE_FILE, {})
+    
+    entry = cache.get(major) if major else None
+    if entry and os.access(entry['path'], os.X_OK):
+        logger.info(f"🚗 ChromeDriver pro Chrome {major} z cache: {entry['path']}")
+        return entry['path']
+    
+    try:
+        logger.info(f"🚗 Zjišťuji ChromeDriver pro Chrome {version or '(neznámá verze)'}...")
+        installed = ChromeDriverManager().install()
+    except Exception as e:
+        cached = [entry for entry in cache.values() if os.access(entry['path'], os.X_OK)]
+        if cached:
+            latest = max(cached, key=lambda entry: entry.get('resolved_at', ''))
+            logger.warning(f"⚠️ ChromeDriver nelze stáhnout ({e}), používám poslední z cache "
+                           f"(Chrome {latest.get('chrome_version')})")
+            return latest['path']
+        logger.warning(f"⚠️ ChromeDriver nelze stáhnout ({e}), zkusím Selenium Manager")
+        return None
+    
+    key = major or 'unknown'
+    target = os.path.join(CHROMEDRIVER_DIR, key, os.path.basename(installed))
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copy2(installed, target)
+    except OSError as e:
+        logger.warning(f"⚠️ ChromeDriver nelze uložit do cache: {e}")
+        return installed
+    
+    cache[key] = {
+        'path': target,
+        'chrome_version': version,
+        'resolved_at': datetime.now().isoformat(timespec='seconds')
+    }
+    save_state(CHROMEDRIVER_CACHE_FILE, cache)
+    return target
+
+def encode_header_value(value):
+    """Hlavičku s diakritikou zakóduje podle RFC 2047, ASCII nechá beze změny"""
+    try:
+        value.encode('ascii')
+        return value
+    except UnicodeEncodeError:
+        from email.header import Header
+        return Header(value, 'utf-8').encode()
+
+class EncodedAttachment:
+    """📎 Příloha zakódovaná do MIME těla jen jednou a sdílená všemi příjemci
+    
+    Tělo zprávy (část s base64 přílohou) se kóduje po blocích do dočasného souboru,
+    takže paměť neroste s velikostí souboru ani s počtem příjemců. Výstup je rovnou
+    ve tvaru pro SMTP DATA (konce řádků CRLF). Žádný řádek nezačíná tečkou (hlavičky,
+    hranice i base64), takže není potřeba dot-stuffing.
+    """
+    
+    def __init__(self, attachment_path, filename=None, content_type='application/epub+zip'):
+        self.boundary = f"==============={uuid.uuid4().hex}=="
+        self.spool = tempfile.TemporaryFile()
+        filename = filename or os.path.basename(attachment_path)
+        
+        part_header = "\r\n".join([
+            f"--{self.boundary}",
+            f"Content-Type: {content_type}",
+            "Content-Transfer-Encoding: base64",
+            f'Content-Disposition: attachment; filename="{filename}"',
+            "",
+            ""
+        ])
+        self.spool.write(part_header.encode('utf-8'))
+        
+        with open(attachment_path, 'rb') as attachment:
+            while True:
+                block = attachment.read(MIME_READ_SIZE)
+                if not block:
+                    break
+                self.spool.write(base64.encodebytes(block).replace(b'\n', b'\r\n'))
+        
+        self.spool.write(f"--{self.boundary}--\r\n".encode('ascii'))
+    
+    def iter_message(self, headers):
+        """Generuje celou zprávu po částech: hlavičky příjemce + sdílené zakódované tělo"""
+        lines = [f"{name}: {encode_header_value(value)}" for name, value in headers.items()]
+        lines += [
+            "MIME-Version: 1.0",
+            f'Content-Type: multipart/mixed; boundary="{self.boundary}"',
+            "",
+            ""
+        ]
+        yield "\r\n".join(lines).encode('utf-8')
+        
+        self.spool.seek(0)
+        while True:
+            chunk = self.spool.read(MIME_READ_SIZE)
+            if not chunk:
+                break
+            yield chunk
+    
+    def close(self):
+        self.spool.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+def send_streaming(server, sender, recipients, chunks):
+    """Odešle zprávu po částech přímo do SMTP DATA (místo server.send_message)"""
+    server.ehlo_or_helo_if_needed()
+    
+    code, response = server.mail(sender)
+    if code != 250:
+        server.rset()
+        raise smtplib.SMTPSenderRefused(code, response, sender)
+    
+    refused = {}
+    for recipient in recipients:
+        code, response = server.rcpt(recipient)
+        if code not in (250, 251):
+            refused[recipient] = (code, response)
+    if len(refused) == len(recipients):
+        server.rset()
+        raise smtplib.SMTPRecipientsRefused(refused)
+    
+    code, response = server.docmd('DATA')
+    if code != 354:
+        server.rset()
+        raise smtplib.SMTPDataError(code, response)
+    
+    for chunk in chunks:
+        server.send(chunk)
+    server.send(b'.\r\n')
+    
+    code, response = server.getreply()
+    if code != 250:
+        server.rset()
+        raise smtplib.SMTPDataError(code, response)
+    return refused
+
+def current_issue_week(day):
+    """Vrátí pondělí týdne, na který je datované právě vycházející číslo"""
+    monday = day - timedelta(days=day.weekday())
+    # Od dne vydání je venku už číslo datované na příští týden
+    if PUBLICATION_WEEKDAY > 0 and day.weekday() >= PUBLICATION_WEEKDAY:
+        monday += timedelta(days=7)
+    return monday
+
+def predict_issue(day=None, last_confirmed=None):
+    """🔮 Odhadne (rok, číslo) aktuálního vydání z kalendáře nebo z posledního potvrzeného čísla"""
+    day = day or date.today()
+    issue_week = current_issue_week(day)
+    iso_year, iso_week, _ = issue_week.isocalendar()
+    
+    # Poslední potvrzené číslo zachycuje i posuny číslování (dvojčísla apod.)
+    if last_confirmed and last_confirmed.get('year') == iso_year:
+        try:
+            confirmed_week = current_issue_week(date.fromisoformat(last_confirmed['confirmed_on']))
+            elapsed_weeks = (issue_week - confirmed_week).days // 7
+            return iso_year, last_confirmed['issue'] + elapsed_weeks
+        except (KeyError, TypeError, ValueError):
+            pass
+    
+    return iso_year, iso_week
+
+def publication_cycle_start(now):
+    """Vrátí začátek aktuálního cyklu vydání (poslední vydání minus předstih kontrol)"""
+    hour, minute = (int(part) for part in PUBLICATION_TIME.split(':'))
+    published = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    published -= timedelta(days=(now.weekday() - PUBLICATION_WEEKDAY) % 7)
+    if published - DAEMON_LEAD > now:
+        published -= timedelta(days=7)
+    return published - DAEMON_LEAD
+
+class StateStore:
+    """Slovník perzistovaný v JSON souboru, na disk se zapisuje jen po změně"""
+    
+    def __init__(self, path):
+        self.path = path
+        self.data = load_state(path, {})
+        self.dirty = False
+        self.lock = threading.Lock()
+    
+    def save(self):
+        """Uloží data, pokud se během běhu změnila"""
+        with self.lock:
+            if not self.dirty:
+                return
+            try:
+                save_state(self.path, self.data)
+                self.dirty = False
+            except OSError as e:
+                logger.warning(f"⚠️ Stav {self.path} nelze uložit: {e}")
+
+def selector_tiers(selectors):
+    """Rozdělí selektory na úrovně kvality - seznam seznamů jsou úrovně, plochý seznam je jedna úroveň"""
+    if selectors and all(isinstance(tier, (list, tuple)) for tier in selectors):
+        return [list(tier) for tier in selectors]
+    return [list(selectors)]
+
+class SelectorStats(StateStore):
+    """📈 Úspěšnost selektorů napříč běhy - poslední vítězové se zkoušejí jako první"""
+    
+    def __init__(self, path=SELECTOR_STATS_FILE):
+        super().__init__(path)
+    
+    def rank(self, key, selectors):
+        """Seřadí selektory podle skóre, při shodě zachová výchozí pořadí
+        
+        Řadí se jen uvnitř úrovně kvality - nouzový selektor nepředběhne kvalitnější,
+        ani když v minulosti vyhrál.
+        """
+        stats = self.data.get(key, {})
+        ranked = []
+        for tier in selector_tiers(selectors):
+            ranked += sorted(tier, key=lambda selector: -stats.get(selector, {}).get('score', 0.0))
+        if ranked != [selector for tier in selector_tiers(selectors) for selector in tier]:
+            logger.debug(f"📈 Pořadí selektorů pro {key}: {ranked}")
+        return ranked
+    
+    def record(self, key, ordered, winner, latency):
+        """Vítěz dostane zásah, selektory zkoušené před ním minutí (selektory za ním se nezkoušely)"""
+        stats = self.data.setdefault(key, {})
+        for selector in ordered:
+            entry = stats.setdefault(selector, {'hits': 0, 'misses': 0, 'score': 0.0, 'latency_ms': None})
+            if selector == winner:
+                latency_ms = latency * 1000
+                if entry['latency_ms'] is not None:
+                    latency_ms = 0.7 * entry['latency_ms'] + 0.3 * latency_ms
+                entry['hits'] += 1
+                entry['score'] = round(entry['score'] * SELECTOR_HIT_DECAY + 1, 4)
+                entry['latency_ms'] = round(latency_ms, 1)
+                entry['last_hit'] = date.today().isoformat()
+                break
+            entry['misses'] += 1
+            entry['score'] = round(entry['score'] * SELECTOR_MISS_DECAY, 4)
+        self.dirty = True
+
+class DiscoveryStats(StateStore):
+    """🏁 Výsledky závodů strategií hledání vydání napříč běhy"""
+    
+    def __init__(self, path=DISCOVERY_STATS_FILE):
+        super().__init__(path)
+    
+    def record(self, name, outcome, latency):
+        """Zapíše výsledek strategie: win, lost (předběhnuta), miss, timeout nebo error"""
+        with self.lock:
+            entry = self.data.setdefault(name, {'runs': 0, 'wins': 0, 'latency_ms': None})
+            entry['runs'] += 1
+            if outcome == 'win':
+                latency_ms = latency * 1000
+                if entry['latency_ms'] is not None:
+                    latency_ms = 0.7 * entry['latency_ms'] + 0.3 * latency_ms
+                entry['wins'] += 1
+                entry['latency_ms'] = round(latency_ms, 1)
+            elif outcome != 'lost':
+                entry[outcome] = entry.get(outcome, 0) + 1
+            self.dirty = True
+    
+    def summary(self):
+        """Úspěšnost strategií jako text do logu, od nejčastějšího vítěze"""
+        ranked = sorted(self.data.items(), key=lambda item: -item[1]['wins'])
+        return ', '.join(
+            f"{name} {entry['wins']}/{entry['runs']} ({entry['wins'] / entry['runs']:.0%})"
+            for name, entry in ranked if entry['runs']
+        )
+
+class IssueIndex(StateStore):
+    """🗂️ Index (rok, číslo) -> issueId, díky kterému jde EPUB stáhnout rovnou přes API"""
+    
+    def __init__(self, path=ISSUE_INDEX_FILE):
+        super().__init__(path)
+    
+    def get(self, year, issue_num):
+        return self.data.get(f"{year}/{issue_num}")
+    
+    def add(self, year, issue_num, issue_id):
+        with self.lock:
+            key = f"{year}/{issue_num}"
+            if self.data.get(key) != issue_id:
+                self.data[key] = issue_id
+                self.dirty = True
+    
+    def numbers(self, year):
+        """Vrátí čísla vydání roku, která už index zná"""
+        prefix = f"{year}/"
+        return sorted(int(key[len(prefix):]) for key in self.data if key.startswith(prefix))
+
+class IssueLedger(StateStore):
+    """📒 Záznam stažených a doručených vydání podle issueId a SHA-256 obsahu"""
+    
+    def __init__(self, path=LEDGER_FILE):
+        super().__init__(path)
+    
+    @staticmethod
+    def key(issue_id, sha256):
+        """Klíčem je issueId, bez něj otisk obsahu"""
+        return issue_id or f"sha256:{sha256}"
+    
+    def find(self, year, issue_num):
+        """Vrátí záznam vydání podle roku a čísla"""
+        for entry in self.data.values():
+            if entry.get('year') == year and entry.get('issue') == issue_num:
+                return entry
+        return None
+    
+    def find_delivered(self, issue_id=None, sha256=None, year=None, issue_num=None):
+        """Vrátí záznam, pokud už bylo vydání (nebo identický obsah) doručeno"""
+        with self.lock:
+            candidates = [self.data.get(issue_id)] if issue_id else []
+            if year is not None:
+                candidates.append(self.find(year, issue_num))
+            if sha256:
+                candidates.extend(entry for entry in self.data.values() if entry.get('sha256') == sha256)
+            for entry in candidates:
+                if entry and entry.get('delivered_at'):
+                    return entry
+        return None
+    
+    def record_download(self, issue_id, sha256, size, filename, year=None, issue_num=None):
+        with self.lock:
+            entry = self.data.setdefault(self.key(issue_id, sha256), {})
+            entry.update({
+                'issue_id': issue_id,
+                'year': year,
+                'issue': issue_num,
+                'sha256': sha256,
+                'size': size,
+                'file': filename,
+                'downloaded_at': datetime.now().isoformat(timespec='seconds')
+            })
+            self.dirty = True
+    
+    def record_delivery(self, issue_id, sha256):
+        with self.lock:
+            entry = self.data.setdefault(self.key(issue_id, sha256), {'issue_id': issue_id, 'sha256': sha256})
+            entry['delivered_at'] = datetime.now().isoformat(timespec='seconds')
+            self.dirty = True
+
+class Tracer:
+    """⏱️ Měření běhu: span pro každou fázi, počty a latence WebDriver příkazů a HTTP požadavků"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        with self.lock:
+            self.started_at = datetime.now()
+            self.started = time.perf_counter()
+            self.spans = []
+            self.webdriver = {}
+            self.http = {}
+    
+    def current_phase(self):
+        active = ACTIVE_SPAN.get()
+        return active[0]['name'] if active else None
+    
+    @contextlib.contextmanager
+    def span(self, name, **attributes):
+        """Změří blok kódu jako span fáze, vnořené spany si pamatují rodiče"""
+        parent = ACTIVE_SPAN.get()
+        span = {
+            'name': name,
+            'parent': parent[0]['name'] if parent else None,
+            'start_ms': round((time.perf_counter() - self.started) * 1000, 1),
+            **attributes
+        }
+        started = time.perf_counter()
+        token = ACTIVE_SPAN.set((span, started))
+        try:
+            yield span
+        except BaseException:
+            span['ok'] = False
+            raise
+        finally:
+            ACTIVE_SPAN.reset(token)
+            span['duration_ms'] = round((time.perf_counter() - started) * 1000, 1)
+            with self.lock:
+                self.spans.append(span)
+    
+    def record_webdriver(self, command, latency):
+        with self.lock:
+            entry = self.webdriver.setdefault(command, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            entry['count'] += 1
+            entry['total_ms'] += latency * 1000
+            entry['max_ms'] = max(entry['max_ms'], latency * 1000)
+    
+    def record_http(self, url, status, latency, received, sent=0):
+        with self.lock:
+            entry = self.http.setdefault(urlparse(url).hostname or '?', {
+                'requests': 0, 'errors': 0, 'bytes_received': 0, 'bytes_sent': 0, 'total_ms': 0.0, 'max_ms': 0.0
+            })
+            entry['requests'] += 1
+            entry['errors'] += status is None or status >= 400
+            entry['bytes_received'] += received
+            entry['bytes_sent'] += sent
+            entry['total_ms'] += latency * 1000
+            entry['max_ms'] = max(entry['max_ms'], latency * 1000)
+    
+    def instrument_driver(self, driver):
+        """Obalí driver.execute - přes něj jde každý WebDriver příkaz včetně CDP"""
+        execute = driver.execute
+        
+        def timed_execute(driver_command, params=None):
+            started = time.perf_counter()
+            try:
+                return execute(driver_command, params)
+            finally:
+                self.record_webdriver(driver_command, time.perf_counter() - started)
+        
+        driver.execute = timed_execute
+        return driver
+    
+    def requests_hook(self, response, **kwargs):
+        """Response hook requests session - u streamovaných odpovědí počítá s Content-Length"""
+        if kwargs.get('stream'):
+            received = int(response.headers.get('Content-Length') or 0)
+        else:
+            received = len(response.content)
+        body = response.request.body or b''
+        self.record_http(response.url, response.status_code, response.elapsed.total_seconds(), received, len(body))
+    
+    def metrics(self):
+        with self.lock:
+            phases = {}
+            for span in self.spans:
+                phase = phases.setdefault(span['name'], {'count': 0, 'total_ms': 0.0, 'failed': 0})
+                phase['count'] += 1
+                phase['total_ms'] = round(phase['total_ms'] + span['duration_ms'], 1)
+                phase['failed'] += span.get('ok') is False
+            
+            def rounded(entries):
+                return {key: {name: round(value, 1) if isinstance(value, float) else value for name, value in entry.items()}
+                        for key, entry in entries.items()}
+            
+            return {
+                'started_at': self.started_at.isoformat(timespec='seconds'),
+                'duration_ms': round((time.perf_counter() - self.started) * 1000, 1),
+                'phases': phases,
+                'spans': sorted(self.spans, key=lambda span: span['start_ms']),
+                'webdriver': {
+                    'commands': sum(entry['count'] for entry in self.webdriver.values()),
+                    'total_ms': round(sum(entry['total_ms'] for entry in self.webdriver.values()), 1),
+                    'by_command': rounded(self.webdriver)
+                },
+                'http': {
+                    'requests': sum(entry['requests'] for entry in self.http.values()),
+                    'bytes_received': sum(entry['bytes_received'] for entry in self.http.values()),
+                    'bytes_sent': sum(entry['bytes_sent'] for entry in self.http.values()),
+                    'total_ms': round(sum(entry['total_ms'] for entry in self.http.values()), 1),
+                    'by_host': rounded(self.http)
+                }
+            }
+    
+    def summary(self, metrics):
+        phases = ', '.join(f"{name} {phase['total_ms'] / 1000:.2f} s" for name, phase in metrics['phases'].items())
+        return (f"{phases or '-'} | WebDriver {metrics['webdriver']['commands']} příkazů "
+                f"{metrics['webdriver']['total_ms'] / 1000:.2f} s | HTTP {metrics['http']['requests']} požadavků "
+                f"{metrics['http']['bytes_received'] / 1e6:.2f} MB {metrics['http']['total_ms'] / 1000:.2f} s")
+    
+    def write(self, path=METRICS_FILE):
+        """Zapíše metriky do JSON souboru a shrnutí do logu"""
+        metrics = self.metrics()
+        logger.info(f"⏱️ Metriky: {self.summary(metrics)}")
+        try:
+            save_state(path, metrics)
+        except OSError as e:
+            logger.warning(f"⚠️ Metriky nelze zapsat: {e}")
+
+def traced(phase):
+    """Dekorátor metody RespektDownloader - volání se zaznamená jako span fáze (ok = výsledek není None/False)"""
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.tracer.span(phase) as span:
+                result = method(self, *args, **kwargs)
+                span['ok'] = result is not None and result is not False
+                return result
+        return wrapper
+    return decorate
+
+class RateLimiter:
+    """🚦 Omezí počet požadavků na jeden host za sekundu, sdílený všemi vlákny"""
+    
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0
+        self.next_slot = {}
+        self.lock = threading.Lock()
+    
+    def reserve(self, host):
+        """Zabere další volný slot pro host, vrátí, kolik sekund se má před požadavkem čekat"""
+        if not self.interval:
+            return 0
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        return slot - now
+    
+    def wait(self, host):
+        delay = self.reserve(host)
+        if delay > 0:
+            time.sleep(delay)
+
+class AsyncRunner:
+    """🔄 Event loop ve vlákně na pozadí - jeden po celý běh, aby přežila keep-alive spojení"""
+    
     def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='respekt-async', daemon=True)
+        self.thread.start()
+    
+    def run(self, coroutine):
+        """Spustí korutinu v event loopu a počká na její výsledek
+        
+        Úloha v loopu by jinak měla kontext vlákna loopu - převezme se kontext volajícího,
+        aby async jádro vidělo aktivní span (trasování i fáze v logu).
+        """
+        context = contextvars.copy_context()
+        
+        async def with_caller_context():
+            for variable, value in context.items():
+                variable.set(value)
+            return await coroutine
+        
+        return asyncio.run_coroutine_threadsafe(with_caller_context(), self.loop).result()
+    
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+class Cassette:
+    """📼 Kazeta s HTTP provozem jednoho běhu (gzip JSON)
+    
+    Při nahrávání se ukládá každá odpověď, kterou dostane requests session i httpx klient,
+    při přehrávání se odpovědi vracejí z kazety místo ze sítě. Požadavky se párují podle
+    metody, URL a hlavičky Range; opakované se přehrávají v pořadí nahrávání a po vyčerpání
+    se opakuje poslední odpověď. Těla a hlavičky požadavků se neukládají, hodnoty cookies
+    z odpovědí se přepisují - kazeta neobsahuje heslo ani platnou session.
+    """
+    
+    # Tělo se ukládá dekódované - hlavičky o kódování a délce by při přehrávání neplatily
+    DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'keep-alive'}
+    TEXT_TYPES = ('text/', 'application/json', 'application/javascript', 'application/xml')
+    
+    def __init__(self, path, replaying=False):
+        self.path = path
+        self.replaying = replaying
+        self.lock = threading.Lock()
+        self.interactions = []
+        self.index = {}
+        self.positions = {}
+        self.misses = 0
+        if replaying:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+            self.interactions = data['interactions']
+            for entry in self.interactions:
+                self.index.setdefault(self.key(entry['method'], entry['url'], entry.get('range')), []).append(entry)
+            logger.info(f"📼 Přehrávám {len(self.interactions)} odpovědí z {path} "
+                        f"(nahráno {data.get('recorded_at', '?')} proti {data.get('base_url', '?')})")
+        else:
+            logger.info(f"📼 Nahrávám HTTP provoz do {path}")
+    
+    @staticmethod
+    def key(method, url, byte_range=None):
+        return method.upper(), url, byte_range or None
+    
+    @classmethod
+    def response_headers(cls, headers):
+        """Hlavičky odpovědi bez těch, které popisují původní kódování těla"""
+        return [(name, value) for name, value in headers if name.lower() not in cls.DROPPED_HEADERS]
+    
+    @staticmethod
+    def redact_cookie(value):
+        name, _, rest = value.partition('=')
+        attributes = rest.partition(';')[2]
+        return f"{name}=cassette" + (f";{attributes}" if attributes else '')
+    
+    def record(self, method, url, byte_range, status, headers, body):
+        """Uloží odpověď do kazety (v paměti, na disk až při save)"""
+        headers = [[name, self.redact_cookie(value) if name.lower() == 'set-cookie' else value]
+                   for name, value in self.response_headers(headers)]
+        entry = {'method': method.upper(), 'url': url, 'range': byte_range or None, 'status': status, 'headers': headers}
+        content_type = next((value for name, value in headers if name.lower() == 'content-type'), '')
+        try:
+            if not content_type.startswith(self.TEXT_TYPES):
+                raise UnicodeDecodeError('utf-8', b'', 0, 0, 'binární obsah')
+            entry['text'] = body.decode('utf-8')
+        except UnicodeDecodeError:
+            entry['base64'] = base64.b64encode(body).decode('ascii')
+        with self.lock:
+            self.interactions.append(entry)
+    
+    def replay(self, method, url, byte_range=None):
+        """Vrátí další nahranou odpověď (status, hlavičky, tělo), nebo None, když v kazetě není"""
+        key = self.key(method, url, byte_range)
+        with self.lock:
+            entries = self.index.get(key)
+            if not entries:
+                self.misses += 1
+                logger.warning(f"📼 {method} {url} v kazetě není")
+                return None
+            position = self.positions.get(key, 0)
+            self.positions[key] = position + 1
+            entry = entries[min(position, len(entries) - 1)]
+        body = entry['text'].encode('utf-8') if 'text' in entry else base64.b64decode(entry.get('base64', ''))
+        return entry['status'], [tuple(header) for header in entry['headers']], body
+    
+    def close(self):
+        """Nahranou kazetu zapíše na disk, u přehrávání shrne chybějící odpovědi"""
+        if self.replaying:
+            if self.misses:
+                logger.warning(f"📼 {self.misses} požadavků v kazetě chybělo - běh se od nahrávky odchýlil")
+            return
+        
+        with self.lock:
+            data = {
+                'recorded_at': datetime.now().isoformat(timespec='seconds'),
+                'base_url': BASE_URL,
+                'interactions': list(self.interactions)
+            }
+        temp_path = f"{self.path}.tmp"
+        try:
+            with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+            logger.info(f"📼 Kazeta uložena: {self.path} ({len(data['interactions'])} odpovědí, "
+                        f"{os.path.getsize(self.path) / 1e6:.2f} MB)")
+        except OSError as e:
+            logger.warning(f"⚠️ Kazetu nelze uložit: {e}")
+
+class CassetteAdapter:
+    """requests adapter, který provoz session nahrává do kazety nebo ho z ní přehrává"""
+    
+    def __init__(self, cassette, adapter):
+        self.cassette = cassette
+        # Skutečný HTTPAdapter - síť při nahrávání, sestavení odpovědi při přehrávání
+        self.adapter = adapter
+    
+    def send(self, request, **kwargs):
+        byte_range = request.headers.get('Range')
+        if self.cassette.replaying:
+            return self._replay(request, byte_range)
+        
+        response = self.adapter.send(request, **kwargs)
+        # Přečte i streamované tělo - iter_content pak vrací přečtená data
+        body = response.content
+        headers = response.raw.headers.items() if response.raw is not None else response.headers.items()
+        self.cassette.record(request.method, request.url, byte_range, response.status_code, headers, body)
+        return response
+    
+    def _replay(self, request, byte_range):
+        import urllib3
+        from http.client import HTTPMessage
+        
+        recorded = self.cassette.replay(request.method, request.url, byte_range)
+        if recorded is None:
+            raise requests.ConnectionError(f"📼 {request.method} {request.url} v kazetě není", request=request)
+        status, headers, body = recorded
+        
+        # Z hlaviček původní odpovědi čte requests cookies
+        message = HTTPMessage()
+        for name, value in headers:
+            message[name] = value
+        raw = urllib3.HTTPResponse(
+            body=io.BytesIO(body), headers=headers + [('Content-Length', str(len(body)))], status=status,
+            preload_content=False, decode_content=False,
+            original_response=types.SimpleNamespace(msg=message, isclosed=lambda: True)
+        )
+        return self.adapter.build_response(request, raw)
+    
+    def close(self):
+        self.adapter.close()
+
+class CassetteTransport:
+    """httpx transport, který provoz klienta nahrává do kazety nebo ho z ní přehrává"""
+    
+    def __init__(self, cassette, transport=None):
+        self.cassette = cassette
+        # Skutečný transport, při přehrávání žádný není
+        self.transport = transport
+    
+    async def handle_async_request(self, request):
+        url = str(request.url)
+        byte_range = request.headers.get('Range')
+        if self.cassette.replaying:
+            recorded = self.cassette.replay(request.method, url, byte_range)
+            if recorded is None:
+                raise httpx.ConnectError(f"📼 {request.method} {url} v kazetě není", request=request)
+            status, headers, body = recorded
+            return httpx.Response(status, headers=headers, content=body, request=request)
+        
+        response = await self.transport.handle_async_request(request)
+        try:
+            body = await response.aread()
+        finally:
+            await response.aclose()
+        headers = response.headers.multi_items()
+        self.cassette.record(request.method, url, byte_range, response.status_code, headers, body)
+        return httpx.Response(response.status_code, headers=Cassette.response_headers(headers), content=body,
+                              request=request, extensions=response.extensions)
+    
+    async def aclose(self):
+        if self.transport is not None:
+            await self.transport.aclose()
+
+class AsyncHttp:
+    """⚡ Asynchronní HTTP: jeden pool keep-alive spojení (httpx, volitelně HTTP/2)
+    
+    Hlavičky i cookies sdílí s requests session, takže přihlášení platí pro obě.
+    Bez httpx se požadavky přes requests session pouštějí ve vláknech.
+    """
+    
+    def __init__(self, session, max_connections=PROBE_WORKERS, tracer=None, cassette=None):
+        self.session = session
+        # Požadavky přes httpx měří tracer přímo, fallback přes session měří její hook
+        self.tracer = tracer
+        # Volitelný RateLimiter pro hromadné stahování
+        self.limiter = None
+        self.semaphore = asyncio.Semaphore(max_connections)
+        self.client = None
+        if httpx is not None:
+            limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+            transport = None
+            if cassette is not None:
+                # Vlastní transport nahrazuje výchozí, HTTP/2 a limity se předávají jemu
+                network = None if cassette.replaying else httpx.AsyncHTTPTransport(http2=HTTP2_ENABLED, limits=limits)
+                transport = CassetteTransport(cassette, network)
+            self.client = httpx.AsyncClient(
+                http2=HTTP2_ENABLED,
+                headers=dict(session.headers),
+                cookies=session.cookies,
+                limits=limits,
+                timeout=HTTP_TIMEOUT,
+                follow_redirects=True,
+                transport=transport
+            )
+    
+    async def _throttle(self, url):
+        if self.limiter:
+            delay = self.limiter.reserve(urlparse(url).hostname)
+            if delay > 0:
+                await asyncio.sleep(delay)
+    
+    async def get_text(self, url, headers=None):
+        """GET požadavek, vrátí (HTTP status, text odpovědi)"""
+        await self._throttle(url)
+        if self.client is not None:
+            started = time.perf_counter()
+            response = await self.client.get(url, headers=headers)
+            if self.tracer:
+                self.tracer.record_http(url, response.status_code, time.perf_counter() - started, len(response.content))
+            return response.status_code, response.text
+        
+        async with self.semaphore:
+            response = await asyncio.to_thread(self.session.get, url, headers=headers, timeout=HTTP_TIMEOUT)
+            return response.status_code, response.text
+    
+    async def download(self, url, filename, headers=None):
+        """⬇️ Stáhne soubor po částech s navázáním po přerušení, vrátí (velikost, sha256)"""
+        if self.client is None:
+            await self._throttle(url)
+            async with self.semaphore:
+                return await asyncio.to_thread(stream_download, self.session, url, filename, headers)
+        
+        writer = EpubWriter(filename)
+        try:
+            for attempt in range(1, DOWNLOAD_RETRIES + 2):
+                await self._throttle(url)
+                try:
+                    started = time.perf_counter()
+                    async with self.client.stream('GET', url, headers=writer.request_headers(headers)) as response:
+                        if self.tracer:
+                            self.tracer.record_http(url, response.status_code, time.perf_counter() - started,
+                                                    int(response.headers.get('Content-Length') or 0))
+                        response.raise_for_status()
+                        writer.start_response(response.status_code, response.headers.get('Content-Range', ''))
+                        async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                            writer.write(chunk)
+                    break
+                
+                except httpx.TransportError as e:
+                    if attempt > DOWNLOAD_RETRIES:
+                        raise
+                    logger.warning(f"⚠️ Stahování přerušeno po {writer.written} bytes ({e}), navazuji ({attempt}/{DOWNLOAD_RETRIES})...")
+                    await asyncio.sleep(attempt)
+            
+            return writer.finish()
+        
+        finally:
+            writer.discard()
+    
+    async def aclose(self):
+        if self.client is not None:
+            await self.client.aclose()
+
+class Outbox:
+    """📮 Trvalá fronta doručení: každá zásilka je JSON soubor a vedle něj její EPUB"""
+    
+    def __init__(self, directory=OUTBOX_DIR):
+        self.directory = directory
+    
+    def _job_path(self, job_id):
+        return os.path.join(self.directory, f"{job_id}.json")
+    
+    def enqueue(self, epub_file, recipients, issue_id=None, sha256=None, year=None, issue_num=None):
+        """Přesune EPUB do fronty a založí zásilku, vrátí ji"""
+        os.makedirs(self.directory, exist_ok=True)
+        job_id = issue_id or sha256[:16]
+        stored_file = os.path.join(self.directory, f"{job_id}.epub")
+        shutil.move(epub_file, stored_file)
+        
+        job = {
+            'id': job_id,
+            'issue_id': issue_id,
+            'sha256': sha256,
+            'year': year,
+            'issue': issue_num,
+            'file': stored_file,
+            'filename': os.path.basename(epub_file),
+            'recipients': list(recipients),
+            'delivered': [],
+            'attempts': 0,
+            'status': 'pending',
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'next_attempt_at': time.time(),
+            'last_error': None
+        }
+        self.update(job)
+        return job
+    
+    def update(self, job):
+        save_state(self._job_path(job['id']), job)
+    
+    def complete(self, job):
+        """Odstraní doručenou zásilku i s jejím souborem"""
+        for path in (job['file'], self._job_path(job['id'])):
+            if os.path.exists(path):
+                os.remove(path)
+    
+    def jobs(self, status=None):
+        """Vrátí zásilky (volitelně jen s daným stavem) seřazené podle data založení"""
+        jobs = []
+        for path in glob.glob(os.path.join(self.directory, '*.json')):
+            job = load_state(path)
+            if job and (status is None or job.get('status') == status):
+                jobs.append(job)
+        return sorted(jobs, key=lambda job: job['created_at'])
+    
+    def get(self, job_id):
+        """Vrátí zásilku podle id, nebo None, pokud už byla dokončena"""
+        return load_state(self._job_path(job_id))
+    
+    def find(self, year, issue_num):
+        for job in self.jobs():
+            if job.get('year') == year and job.get('issue') == issue_num:
+                return job
+        return None
+
+def retry_delay(attempts):
+    """Exponenciální čekání s jitterem (polovina pevně, polovina náhodně)"""
+    delay = min(OUTBOX_BACKOFF_CAP, OUTBOX_BACKOFF_BASE * 2 ** (attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+class IssueProbes:
+    """🧪 Sdílené ověřování existence vydání - souběžné strategie se na stejnou URL ptají jen jednou
+    
+    Neexistující vydání je jen 404 nebo stránka bez platného titulku. Chyba (5xx, timeout,
+    spojení) se po opakováních propaguje, takže strategie, která na ni narazí, nic nepotvrdí.
+    """
+    
+    def __init__(self, downloader):
+        self.downloader = downloader
+        self.tasks = {}
+    
+    async def _probe(self, year, issue_num):
+        for attempt in range(1, PROBE_RETRIES + 2):
+            try:
+                return await self.downloader._aprobe_issue(year, issue_num)
+            except Exception as e:
+                if attempt > PROBE_RETRIES:
+                    raise IOError(f"vydání {issue_num}/{year} nelze ověřit: {e}") from e
+                logger.warning(f"⚠️ Chyba při testování vydání {issue_num}: {e}, zkouším znovu ({attempt}/{PROBE_RETRIES})...")
+                await asyncio.sleep(0.5 * attempt)
+    
+    async def exists(self, year, issue_num):
+        if issue_num < 1:
+            return True
+        if issue_num > MAX_ISSUES_PER_YEAR:
+            return False
+        key = (year, issue_num)
+        if key not in self.tasks:
+            self.tasks[key] = asyncio.ensure_future(self._probe(year, issue_num))
+        # Zrušení jedné strategie nesmí zrušit ověření, na které čekají ostatní
+        return await asyncio.shield(self.tasks[key])
+    
+    async def is_latest(self, year, issue_num):
+        """Vydání je aktuální, když existuje a následující číslo ještě ne"""
+        found, next_found = await asyncio.gather(self.exists(year, issue_num), self.exists(year, issue_num + 1))
+        return found and not next_found
+    
+    def cancel(self):
+        """Zruší ověřování, na které už nikdo nečeká"""
+        for task in self.tasks.values():
+            task.cancel()
+
+class DiscoveryStrategy(abc.ABC):
+    """Strategie hledání aktuálního vydání - vrátí potvrzené (rok, číslo), nebo None"""
+    
+    name = None
+    
+    @abc.abstractmethod
+    async def discover(self, downloader, probes, year, predicted):
+        """Vrátí potvrzené (rok, číslo) aktuálního vydání, nebo None"""
+
+class PredictedIssueStrategy(DiscoveryStrategy):
+    """🔮 Ověří jen číslo odhadnuté z kalendáře - při správném odhadu jediné kolo požadavků"""
+    
+    name = 'predicted'
+    
+    async def discover(self, downloader, probes, year, predicted):
+        if await probes.is_latest(year, predicted):
+            return year, predicted
+        return None
+
+class CachedIssueStrategy(DiscoveryStrategy):
+    """🗂️ Ověří poslední známé číslo roku z indexu a z posledního běhu (a číslo po něm)"""
+    
+    name = 'cached'
+    
+    async def discover(self, downloader, probes, year, predicted):
+        known = downloader.issue_index.numbers(year)
+        last_confirmed = load_state(ISSUE_CACHE_FILE) or {}
+        if last_confirmed.get('year') == year:
+            known.append(last_confirmed['issue'])
+        if not known:
+            return None
+        
+        latest = max(known)
+        candidates = [latest, latest + 1]
+        confirmed = await asyncio.gather(*(probes.is_latest(year, num) for num in candidates))
+        for issue_num, is_latest in zip(candidates, confirmed):
+            if is_latest:
+                return year, issue_num
+        return None
+
+class ArchivePageStrategy(DiscoveryStrategy):
+    """📚 Vezme nejvyšší číslo ze stránky archivu roku a ověří ho"""
+    
+    name = 'archive'
+    
+    async def discover(self, downloader, probes, year, predicted):
+        issue_numbers = await downloader._aarchive_issue_numbers(year)
+        if issue_numbers and await probes.is_latest(year, issue_numbers[-1]):
+            return year, issue_numbers[-1]
+        return None
+
+class DirectUrlStrategy(DiscoveryStrategy):
+    """🔎 Galopující a binární hledání přímými URL od odhadu, na přelomu roku i v minulém roce"""
+    
+    name = 'direct'
+    
+    async def discover(self, downloader, probes, year, predicted):
+        issue_num = await downloader._afind_latest_issue(year, predicted, probes)
+        if issue_num is None:
+            # Na přelomu roku ještě nemusí být venku první číslo nového roku
+            year -= 1
+            logger.info(f"🔄 V roce {year + 1} nic, zkouším rok {year}...")
+            issue_num = await downloader._afind_latest_issue(year, 52, probes)
+        return (year, issue_num) if issue_num is not None else None
+
+# Projde skupiny selektorů (CSS i XPath) přímo ve stránce a pro každou skupinu vrátí
+# první shodu i s textem a atributy - vše v jediném WebDriver požadavku
+RESOLVE_SELECTORS_SCRIPT = """
+const groups = arguments[0];
+const result = {};
+for (const [name, selectors] of Object.entries(groups)) {
+    result[name] = null;
+    for (let index = 0; index < selectors.length; index++) {
+        const selector = selectors[index];
+        let element = null;
+        try {
+            if (selector.startsWith('//') || selector.startsWith('(')) {
+                element = document.evaluate(selector, document, null,
+                    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            } else {
+                element = document.querySelector(selector);
+            }
+        } catch (e) {
+            continue;
+        }
+        if (element) {
+            result[name] = {
+                index: index,
+                selector: selector,
+                element: element,
+                tag: element.tagName.toLowerCase(),
+                text: (element.innerText || element.textContent || '').trim().slice(0, 200),
+                href: element.href || element.getAttribute('href'),
+                onclick: element.getAttribute('onclick')
+            };
+            break;
+        }
+    }
+}
+return result;
+"""
+
+class ResourceBlocker:
+    """🚫 Blokuje v prohlížeči obrázky, fonty, styly a měřicí skripty přes DevTools
+    
+    Souhrn blokovaných a stažených požadavků čte z performance logu Chrome - po každém
+    průchodu, aby ChromeDriver v dlouho běžícím démonovi nedržel události v paměti.
+    """
+    
+    def __init__(self, types=BLOCKED_RESOURCE_TYPES, hosts=BLOCKED_HOSTS):
+        self.types = types
+        self.patterns = [pattern for name in types for pattern in BLOCKED_RESOURCE_PATTERNS.get(name, [])]
+        self.patterns += [f"*{host}/*" for host in hosts]
+        self.requests = 0
+        self.bytes = 0
+        self.blocked = {}
+        self.request_types = {}
+    
+    def configure(self, options):
+        """Zapne performance log (jen síťové události) a obrázky vypne i v nastavení profilu"""
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+        if 'Image' in self.types:
+            options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+    
+    def attach(self, driver):
+        if not self.patterns:
+            return
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.patterns})
+            logger.info(f"🚫 Blokuji {', '.join(self.types) or 'žádné typy'} a {len(self.patterns)} vzorů URL")
+        except Exception as e:
+            logger.warning(f"⚠️ Blokování požadavků nelze zapnout: {e}")
+    
+    def collect(self, driver):
+        """Započítá požadavky z performance logu (log se čtením vyprázdní)"""
+        try:
+            entries = driver.get_log('performance')
+        except Exception as e:
+            logger.debug(f"Performance log nelze přečíst: {e}")
+            return
+        
+        for entry in entries:
+            message = json.loads(entry['message']).get('message', {})
+            method, params = message.get('method'), message.get('params', {})
+            if method == 'Network.requestWillBeSent':
+                self.requests += 1
+                self.request_types[params.get('requestId')] = params.get('type', 'Other')
+            elif method == 'Network.loadingFinished':
+                self.bytes += int(params.get('encodedDataLength', 0))
+                self.request_types.pop(params.get('requestId'), None)
+            elif method == 'Network.loadingFailed':
+                request_type = self.request_types.pop(params.get('requestId'), 'Other')
+                if params.get('blockedReason'):
+                    resource_type = params.get('type') or request_type
+                    self.blocked[resource_type] = self.blocked.get(resource_type, 0) + 1
+    
+    def reset(self):
+        """Vynuluje počítadla pro další průchod"""
+        self.requests = 0
+        self.bytes = 0
+        self.blocked = {}
+    
+    def summary(self):
+        blocked = sum(self.blocked.values())
+        by_type = ', '.join(f"{name} {count}" for name, count in sorted(self.blocked.items(), key=lambda item: -item[1]))
+        return (f"zablokováno {blocked} z {self.requests} požadavků ({by_type or '-'}), "
+                f"staženo {self.bytes / 1e3:.0f} kB v {self.requests - blocked} požadavcích")
+
+class DebugCapture:
+    """📸 Zachycení stavu stránky při chybách
+    
+    V hlavním vlákně se stáhne jen URL, titulek a DOM jedním příkazem, komprese
+    a screenshot (JPEG přes DevTools) běží ve vlákně na pozadí. V paměti se drží
+    posledních N stavů, na disk se zapíší, až když běh opravdu selže. Příkazy
+    WebDriveru z vlákna i z hlavního běhu serializuje zámek kolem driver.execute.
+    """
+    
+    def __init__(self, keep=DEBUG_CAPTURE_KEEP, screenshot_quality=DEBUG_SCREENSHOT_QUALITY):
+        self.states = collections.deque(maxlen=keep)
+        self.screenshot_quality = screenshot_quality
+        self.driver_lock = threading.RLock()
+        self.executor = None
+        self.sequence = 0
+    
+    def attach(self, driver):
+        """Obalí driver.execute zámkem, aby screenshot z vlákna nevstoupil mezi jiné příkazy"""
+        execute = driver.execute
+        
+        def locked_execute(*args, **kwargs):
+            with self.driver_lock:
+                return execute(*args, **kwargs)
+        
+        driver.execute = locked_execute
+    
+    def _submit(self, function, *args):
+        if self.executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='debug-capture')
+        return self.executor.submit(function, *args)
+    
+    def capture(self, driver, name, phase=None):
+        """Zachytí stav stránky do paměti, zbytek práce předá vláknu na pozadí"""
+        if not self.states.maxlen:
+            return
+        
+        started = time.perf_counter()
+        try:
+            url, title, source = driver.execute_script(
+                "return [location.href, document.title, document.documentElement.outerHTML]")
+        except Exception as e:
+            logger.error(f"Chyba při zachycení stavu stránky: {e}")
+            return
+        
+        self.sequence += 1
+        state = {
+            'sequence': self.sequence,
+            'name': name,
+            'phase': phase,
+            'captured_at': datetime.now().isoformat(timespec='seconds'),
+            'url': url,
+            'title': title,
+            'html_size': len(source),
+            'html': None,
+            'screenshot': None
+        }
+        self.states.append(state)
+        self._submit(self._complete, driver, state, source)
+        if html_logger.isEnabledFor(logging.DEBUG):
+            html_logger.debug(f"HTML stavu '{name}':\n{source}")
+        logger.info(f"📸 Zachycen stav '{name}': {title!r} {url} "
+                    f"({len(source) / 1000:.0f} kB HTML, {(time.perf_counter() - started) * 1000:.0f} ms)")
+    
+    def _complete(self, driver, state, source):
+        """Ve vlákně: zkomprimuje DOM a pořídí screenshot, pokud je stránka pořád stejná"""
+        state['html'] = gzip.compress(source.encode('utf-8'))
+        if self.screenshot_quality <= 0:
+            return
+        try:
+            with self.driver_lock:
+                # Hlavní běh mezitím mohl přejít jinam - screenshot jiné stránky by mátl
+                if driver.current_url != state['url']:
+                    state['screenshot_skipped'] = "stránka se mezitím změnila"
+                    return
+                result = driver.execute_cdp_cmd('Page.captureScreenshot',
+                                                {'format': 'jpeg', 'quality': self.screenshot_quality})
+            state['screenshot'] = base64.b64decode(result['data'])
+        except Exception as e:
+            state['screenshot_skipped'] = str(e)
+            logger.debug(f"Screenshot nelze pořídit: {e}")
+    
+    def flush(self):
+        """Předá zachycené stavy k zápisu na disk (debug_NN_název.*) a vyprázdní buffer"""
+        states = list(self.states)
+        self.states.clear()
+        if states:
+            self._submit(self._write, states)
+    
+    def _write(self, states):
+        index = []
+        for state in states:
+            prefix = f"debug_{state['sequence']:02d}_{state['name']}"
+            entry = {key: value for key, value in state.items() if key not in ('html', 'screenshot')}
+            try:
+                if state['html'] is not None:
+                    entry['html_file'] = f"{prefix}.html.gz"
+                    with open(entry['html_file'], 'wb') as f:
+                        f.write(state['html'])
+                if state['screenshot'] is not None:
+                    entry['screenshot_file'] = f"{prefix}.jpg"
+                    with open(entry['screenshot_file'], 'wb') as f:
+                        f.write(state['screenshot'])
+            except OSError as e:
+                logger.error(f"Chyba při ukládání debug info: {e}")
+            index.append(entry)
+        
+        try:
+            save_state(DEBUG_INDEX_FILE, index)
+        except OSError as e:
+            logger.error(f"Chyba při ukládání debug info: {e}")
+        logger.info(f"📸 Uloženo {len(states)} zachycených stavů stránek, přehled v {DEBUG_INDEX_FILE}")
+    
+    def discard(self):
+        """Zahodí zachycené stavy - průchod skončil úspěšně"""
+        self.states.clear()
+    
+    def close(self):
+        """Počká na rozpracované screenshoty a zápisy - musí proběhnout před ukončením prohlížeče"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+class PageWaiter:
+    """⏱️ Čekání na skutečné signály připravenosti stránky místo pevných pauz"""
+    
+    def __init__(self, driver, stats=None):
+        self.driver = driver
+        self.stats = stats
+    
+    def until(self, condition, phase, description):
+        """Počká na podmínku nejdéle po limit dané fáze, při vypršení vrátí None"""
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.common.exceptions import TimeoutException
+        
+        timeout = WAIT_TIMEOUTS[phase]
+        started = time.monotonic()
+        try:
+            result = WebDriverWait(self.driver, timeout, poll_frequency=WAIT_POLL_INTERVAL).until(condition)
+            logger.debug(f"⏱️ {description}: {time.monotonic() - started:.2f} s ({phase})")
+            return result
+        except TimeoutException:
+            logger.warning(f"⏱️ {description} - vypršel limit {timeout:g} s ({phase})")
+            return None
+    
+    def resolve(self, groups):
+        """🎯 Najde první shodu pro každou skupinu selektorů jedním voláním execute_script
+        
+        Vrací {skupina: {'selector', 'index', 'element', 'tag', 'text', 'href', 'onclick'} nebo None}
+        """
+        return self.driver.execute_script(RESOLVE_SELECTORS_SCRIPT, groups)
+    
+    def find_first(self, selectors, phase=None, usable=None):
+        """Vrátí první shodu ze seznamu selektorů, nebo None (s fází se učí pořadí)"""
+        groups = self._rank(phase, {'match': selectors})
+        started = time.monotonic()
+        found = self.resolve(groups)
+        self._record(phase, groups, found, time.monotonic() - started, {'match': usable})
+        return found['match']
+    
+    def _rank(self, phase, groups):
+        """Seřadí selektory ve skupinách podle statistik z předchozích běhů (úrovně se zploští)"""
+        if not self.stats or not phase:
+            return {name: [selector for tier in selector_tiers(selectors) for selector in tier]
+                    for name, selectors in groups.items()}
+        return {name: self.stats.rank(f"{phase}.{name}", selectors) for name, selectors in groups.items()}
+    
+    def _record(self, phase, groups, found, latency, usable=None):
+        """Zapíše do statistik, který selektor v každé skupině vyhrál
+        
+        `usable` je {skupina: podmínka} - shoda, ze které nejde nic použít (např. tlačítko
+        bez odkazu), není zásah, ale minutí, aby se příště nezkoušela jako první.
+        """
+        if not self.stats or not phase:
+            return
+        for name, selectors in groups.items():
+            match = found.get(name) if found else None
+            check = (usable or {}).get(name)
+            if match and check and not check(match):
+                self.stats.record(f"{phase}.{name}", selectors[:match['index'] + 1], None, latency)
+                continue
+            self.stats.record(f"{phase}.{name}", selectors, match['selector'] if match else None, latency)
+    
+    def document_ready(self, phase='page_load'):
+        """Počká, až je DOM načtený (document.readyState)"""
+        return self.until(
+            lambda driver: driver.execute_script("return document.readyState") in ('interactive', 'complete'),
+            phase,
+            "Načtení dokumentu"
+        )
+    
+    def wait_for_groups(self, groups, phase, required, usable=None):
+        """Počká, až se objeví shoda pro skupinu `required`, a vrátí shody všech skupin"""
+        groups = self._rank(phase, groups)
+        started = time.monotonic()
+        found = self.until(
+            lambda driver: (lambda found: found if found[required] else False)(self.resolve(groups)),
+            phase,
+            f"Hledání selektorů ({', '.join(groups)})"
+        )
+        self._record(phase, groups, found, time.monotonic() - started, usable)
+        return found
+    
+    def any_selector(self, selectors, phase, usable=None):
+        """Počká, až se objeví kterýkoli ze selektorů, vrátí jeho shodu (nebo None)"""
+        found = self.wait_for_groups({'match': selectors}, phase, 'match', {'match': usable})
+        return found['match'] if found else None
+    
+    def url_change(self, old_url, phase, selectors=()):
+        """Počká na změnu URL (nebo na některý ze selektorů, pokud se stránka nepřesměruje)"""
+        return self.until(
+            lambda driver: driver.current_url != old_url or bool(selectors and self.find_first(selectors)),
+            phase,
+            "Čekání na přesměrování"
+        )
+    
+    def network_idle(self, phase='network_idle'):
+        """Počká, až stránka chvíli nestahuje žádné další zdroje"""
+        state = {'count': -1, 'since': time.monotonic()}
+        
+        def idle(driver):
+            count = driver.execute_script("return performance.getEntriesByType('resource').length")
+            now = time.monotonic()
+            if count != state['count']:
+                state['count'] = count
+                state['since'] = now
+                return False
+            return now - state['since'] >= NETWORK_IDLE_QUIET
+        
+        return self.until(idle, phase, "Utichnutí sítě")
+
+class RespektDownloader:
+    def __init__(self, cassette=None):
         self.driver = None
-        self.setup_browser()
+        self.waiter = None
+        self.resource_blocker = ResourceBlocker()
+        self.debug_capture = DebugCapture()
+        self.tracer = Tracer()
+        # HTTP session vzniká až při prvním síťovém požadavku
+        self._session = None
+        # Volitelná kazeta, do které se HTTP provoz nahrává nebo se z ní přehrává
+        self.cassette = cassette
+        # Ověřené přihlášení - démon ho drží mezi průchody
+        self.authenticated = False
+        self.selector_stats = SelectorStats()
+        self.issue_index = IssueIndex()
+        self.ledger = IssueLedger()
+        self.outbox = Outbox()
+        # Strategie hledání aktuálního vydání, které spolu závodí
+        self.discovery_strategies = [
+            PredictedIssueStrategy(),
+            CachedIssueStrategy(),
+            ArchivePageStrategy(),
+            DirectUrlStrategy()
+        ]
+        self.discovery_stats = DiscoveryStats()
+        # Asynchronní HTTP vrstva a její event loop vznikají až při prvním použití
+        self.async_runner = None
+        self.async_http = None
+        # Poslední stažené vydání: issue_id, year, issue, sha256, size, file
+        self.last_download = None
+    
+    @property
+    def session(self):
+        if self._session is None:
+            self._session = self._create_session()
+        return self._session
     
+    def _create_session(self):
+        """Vytvoří sdílenou HTTP session se stejnou identitou jako prohlížeč"""
+        from requests.adapters import HTTPAdapter
+        
+        session = requests.Session()
+        session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept-Language': 'cs,en;q=0.8'
+        })
+        # Pool spojení dost velký pro souběžné zkoušení vydání
+        adapter = HTTPAdapter(pool_maxsize=max(PROBE_WORKERS, 10))
+        if self.cassette is not None:
+            adapter = CassetteAdapter(self.cassette, adapter)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.hooks['response'].append(self.tracer.requests_hook)
+        return session
+    
+    def _http(self, max_connections=PROBE_WORKERS):
+        """Vrátí asynchronního HTTP klienta sdílejícího cookies se session"""
+        if self.async_http is None:
+            self.async_http = AsyncHttp(self.session, max_connections, self.tracer, self.cassette)
+        return self.async_http
+    
+    def _run_async(self, coroutine):
+        """Spustí korutinu v event loopu na pozadí a počká na výsledek"""
+        if self.async_runner is None:
+            self.async_runner = AsyncRunner()
+        return self.async_runner.run(coroutine)
+    
+    def _ensure_browser(self):
+        """Spustí Chrome až ve chvíli, kdy je opravdu potřeba"""
+        if self.driver is None:
+            self.setup_browser()
+            self._push_cookies_to_browser()
+        return self.driver
+    
+    def _push_cookies_to_browser(self):
+        """Předá cookies z HTTP session do prohlížeče (např. po HTTP přihlášení)"""
+        cookies = list(self.session.cookies)
+        if not cookies:
+            return
+        
+        # Cookies lze nastavit jen pro doménu, na které prohlížeč právě je
+        self.driver.get(BASE_URL)
+        for cookie in cookies:
+            browser_cookie = {
+                'name': cookie.name,
+                'value': cookie.value,
+                'path': cookie.path or '/',
+                'secure': bool(cookie.secure)
+            }
+            if cookie.domain_specified:
+                browser_cookie['domain'] = cookie.domain
+            if cookie.expires:
+                browser_cookie['expiry'] = int(cookie.expires)
+            try:
+                self.driver.add_cookie(browser_cookie)
+            except Exception as e:
+                logger.debug(f"Cookie {cookie.name} nelze předat prohlížeči: {e}")
+        logger.info(f"🍪 Do prohlížeče předáno {len(cookies)} cookies z HTTP session")
+    
+    def _sync_cookies_from_browser(self):
+        """Zkopíruje cookies z prohlížeče do HTTP session"""
+        if self.driver is None:
+            return
+        for cookie in self.driver.get_cookies():
+            # Expirace a secure se ukládají se session - restore_session podle nich vyřazuje prošlé cookies
+            self.session.cookies.set(
+                cookie['name'],
+                cookie['value'],
+                domain=cookie.get('domain', ''),
+                path=cookie.get('path', '/'),
+                expires=cookie.get('expiry'),
+                secure=bool(cookie.get('secure', False))
+            )
+    
+    @traced('browser_start')
     def setup_browser(self):
         """Nastaví Chrome pro headless mode s optimalizací pro GitHub Actions"""
+        if self.cassette is not None:
+            # Provoz prohlížeče jde mimo requests i httpx, kazeta ho nezachytí
+            if self.cassette.replaying:
+                raise RuntimeError("📼 Při přehrávání kazety se prohlížeč nespouští (jeho provoz se nenahrává)")
+            logger.warning("📼 Provoz prohlížeče se do kazety nenahrává")
+        
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+        
         chrome_options = Options()
         chrome_options.add_argument('--headless')
         chrome_options.add_argument('--no-sandbox')
         chrome_options.add_argument('--disable-dev-shm-usage')
         chrome_options.add_argument('--disable-gpu')
         chrome_options.add_argument('--disable-extensions')
-        chrome_options.add_argument('--disable-plugins')
-        chrome_options.add_argument('--disable-images')
         chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument('--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+        chrome_options.add_argument(f'--user-agent={USER_AGENT}')
         
         # Dodatečné argumenty pro stabilitu
         chrome_options.add_argument('--disable-background-timer-throttling')
@@ -80,149 +1928,318 @@ class RespektDownloader:
         chrome_options.add_argument('--password-store=basic')
         chrome_options.add_argument('--use-mock-keychain')
         
+        # driver.get() se vrátí po DOMContentLoaded, na zbytek čeká PageWaiter
+        chrome_options.page_load_strategy = 'eager'
+        
+        # Obrázky, fonty, styly a měřicí skripty se vůbec nestahují
+        self.resource_blocker.configure(chrome_options)
+        
         try:
             self.driver = webdriver.Chrome(
-                service=Service(ChromeDriverManager().install()),
+                service=Service(resolve_chromedriver()),
                 options=chrome_options
             )
-            self.wait = WebDriverWait(self.driver, 30)
+            self.tracer.instrument_driver(self.driver)
+            self.debug_capture.attach(self.driver)
+            self.resource_blocker.attach(self.driver)
+            self.waiter = PageWaiter(self.driver, self.selector_stats)
             logger.info("Browser inicializován úspěšně")
         except Exception as e:
             logger.error(f"Chyba při inicializaci browseru: {e}")
             raise
     
+    @traced('session_restore')
+    def restore_session(self):
+        """♻️ Obnoví uloženou session z disku a ověří ji jedním požadavkem"""
+        data = load_state(SESSION_FILE)
+        if not data:
+            logger.info("Uložená session neexistuje, bude potřeba se přihlásit")
+            return False
+        
+        try:
+            saved_at = datetime.fromisoformat(data['saved_at'])
+            if datetime.now() - saved_at > SESSION_MAX_AGE:
+                logger.info(f"Uložená session je příliš stará ({saved_at:%Y-%m-%d %H:%M})")
+                return False
+            
+            now = time.time()
+            cookies = [c for c in data['cookies'] if not c.get('expires') or c['expires'] > now]
+            if not cookies:
+                logger.info("Všechny uložené cookies už vypršely")
+                return False
+            
+            for cookie in cookies:
+                self.session.cookies.set(
+                    cookie['name'],
+                    cookie['value'],
+                    domain=cookie.get('domain', ''),
+                    path=cookie.get('path', '/'),
+                    secure=cookie.get('secure', False),
+                    expires=cookie.get('expires')
+                )
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"⚠️ Uložená session je poškozená: {e}")
+            self.session.cookies.clear()
+            return False
+        
+        logger.info(f"🍪 Načteno {len(cookies)} cookies z uložené session ({saved_at:%Y-%m-%d %H:%M}), ověřuji...")
+        
+        try:
+            response = self.session.get(SESSION_PROBE_URL, timeout=HTTP_TIMEOUT)
+            if response.ok and self._is_logged_in_html(response.text):
+                logger.info("✅ Uložená session je platná - přihlášení přeskočeno")
+                return True
+            logger.info(f"Uložená session už neplatí (HTTP {response.status_code})")
+        except requests.RequestException as e:
+            logger.warning(f"⚠️ Ověření uložené session selhalo: {e}")
+        
+        self.session.cookies.clear()
+        return False
+    
+    def save_session(self):
+        """💾 Uloží cookies přihlášené session i s expirací na disk"""
+        try:
+            self._sync_cookies_from_browser()
+            cookies = [
+                {
+                    'name': cookie.name,
+                    'value': cookie.value,
+                    'domain': cookie.domain,
+                    'path': cookie.path,
+                    'secure': bool(cookie.secure),
+                    'expires': cookie.expires
+                }
+                for cookie in self.session.cookies
+            ]
+            save_state(SESSION_FILE, {
+                'saved_at': datetime.now().isoformat(timespec='seconds'),
+                'cookies': cookies
+            })
+            logger.info(f"💾 Session uložena ({len(cookies)} cookies): {SESSION_FILE}")
+        except Exception as e:
+            logger.warning(f"⚠️ Session se nepodařilo uložit: {e}")
+    
     def save_debug_info(self, name):
-        """Uloží screenshot a HTML pro debugging"""
+        """📸 Zachytí stav stránky pro debugging - na disk se zapíše, až když běh selže"""
+        if self.driver is None:
+            logger.info(f"Debug info '{name}' přeskočeno - prohlížeč neběží")
+            return
+        
+        self.debug_capture.capture(self.driver, name, self.tracer.current_phase())
+    
+    @traced('login')
+    def login(self):
+        """Přihlášení na Respekt.cz - nejdřív přes HTTP, prohlížeč jen jako záloha"""
+        if LOGIN_MODE in ('auto', 'http'):
+            if self._http_login():
+                return True
+            
+            if LOGIN_MODE == 'http':
+                logger.error("❌ HTTP přihlášení selhalo a záloha přes prohlížeč je vypnutá")
+                return False
+            
+            logger.info("🔄 Zkouším přihlášení přes prohlížeč...")
+        
+        return self._browser_login()
+    
+    def _http_login(self):
+        """🌐 Přihlášení čistě přes requests, bez spouštění prohlížeče"""
         try:
-            # Uložit screenshot
-            screenshot_path = f"debug_{name}.png"
-            self.driver.save_screenshot(screenshot_path)
-            logger.info(f"Screenshot uložen: {screenshot_path}")
+            logger.info("🌐 Přihlašuji se na Respekt.cz přes HTTP...")
             
-            # Uložit HTML
-            html_path = f"debug_{name}.html"
-            with open(html_path, 'w', encoding='utf-8') as f:
-                f.write(self.driver.page_source)
-            logger.info(f"HTML uloženo: {html_path}")
+            response = self.session.get(LOGIN_URL, timeout=HTTP_TIMEOUT)
+            response.raise_for_status()
+            logger.info(f"Přihlašovací stránka načtena: {response.url}")
+            
+            # Najdi formulář s heslem
+            soup = bs4.BeautifulSoup(response.text, 'html.parser')
+            form = None
+            for candidate in soup.find_all('form'):
+                if candidate.find('input', attrs={'type': 'password'}):
+                    form = candidate
+                    break
             
-            # Vypsat část HTML do logu
-            logger.info("HTML stránky (prvních 1500 znaků):")
-            logger.info(self.driver.page_source[:1500])
+            if form is None:
+                logger.warning("⚠️ Přihlašovací formulář v HTML není (možná ho vykresluje JavaScript)")
+                return False
+            
+            payload, email_name, password_name = self._collect_form_fields(form)
+            if not email_name or not password_name:
+                logger.warning(f"⚠️ Ve formuláři chybí pole pro email nebo heslo ({email_name}, {password_name})")
+                return False
+            
+            payload[email_name] = RESPEKT_LOGIN
+            payload[password_name] = RESPEKT_PASSWORD
+            
+            headers = {'Referer': response.url, 'Origin': BASE_URL}
+            csrf_meta = soup.find('meta', attrs={'name': re.compile('csrf', re.I)})
+            if csrf_meta and csrf_meta.get('content'):
+                headers['X-CSRF-Token'] = csrf_meta['content']
+            
+            action = urljoin(response.url, form.get('action') or response.url)
+            method = (form.get('method') or 'post').lower()
+            logger.info(f"📨 Odesílám přihlašovací formulář ({len(payload)} polí) na {action}")
+            
+            if method == 'get':
+                response = self.session.get(action, params=payload, headers=headers, timeout=HTTP_TIMEOUT)
+            else:
+                response = self.session.post(action, data=payload, headers=headers, timeout=HTTP_TIMEOUT)
+            response.raise_for_status()
+            logger.info(f"Aktuální URL po přihlášení: {response.url}")
+            
+            if self._is_logged_in_html(response.text):
+                logger.info("✅ Přihlášení přes HTTP potvrzeno")
+                return True
+            
+            # Některé weby po přihlášení vrací jen mezistránku - ověř na hlavní stránce
+            response = self.session.get(BASE_URL, timeout=HTTP_TIMEOUT)
+            if response.ok and self._is_logged_in_html(response.text):
+                logger.info("✅ Přihlášení přes HTTP potvrzeno na hlavní stránce")
+                return True
+            
+            logger.warning("⚠️ Po odeslání formuláře nejsou vidět značky přihlášeného uživatele")
+            return False
             
         except Exception as e:
-            logger.error(f"Chyba při ukládání debug info: {e}")
+            logger.warning(f"⚠️ HTTP přihlášení selhalo: {e}")
+            return False
     
-    def login(self):
-        """Přihlášení na Respekt.cz"""
+    @staticmethod
+    def _collect_form_fields(form):
+        """Vrátí skrytá pole formuláře (CSRF tokeny apod.) a názvy polí pro email a heslo"""
+        payload = {}
+        email_name = None
+        password_name = None
+        
+        for field in form.find_all('input'):
+            name = field.get('name')
+            if not name:
+                continue
+            
+            field_type = (field.get('type') or 'text').lower()
+            if field_type == 'password':
+                password_name = password_name or name
+            elif field_type == 'email' or (field_type == 'text' and re.search('mail|login|user', name, re.I)):
+                email_name = email_name or name
+            elif field_type == 'hidden':
+                payload[name] = field.get('value', '')
+            elif field_type in ('checkbox', 'radio'):
+                if field.has_attr('checked'):
+                    payload[name] = field.get('value', 'on')
+            elif field_type == 'submit':
+                payload.setdefault(name, field.get('value', ''))
+        
+        submit_button = form.find('button', attrs={'name': True})
+        if submit_button:
+            payload.setdefault(submit_button['name'], submit_button.get('value', ''))
+        
+        return payload, email_name, password_name
+    
+    @staticmethod
+    def _is_logged_in_html(html):
+        """Zkontroluje, jestli HTML odpovídá přihlášenému uživateli"""
+        if re.search(r'<input[^>]+type=["\']?password', html, re.I):
+            return False
+        return any(marker in html for marker in LOGGED_IN_MARKERS)
+    
+    def _browser_login(self):
+        """Přihlášení na Respekt.cz přes prohlížeč"""
         try:
-            logger.info("🔐 Přihlašuji se na Respekt.cz...")
+            logger.info("🔐 Přihlašuji se na Respekt.cz přes prohlížeč...")
+            self._ensure_browser()
             
             # Načti hlavní stránku nejdříve
-            self.driver.get("https://www.respekt.cz")
-            time.sleep(2)
+            self.driver.get(BASE_URL)
+            self.waiter.document_ready()
             logger.info(f"Hlavní stránka načtena, title: {self.driver.title}")
             
             # Teď jdi na přihlášení  
-            self.driver.get("https://www.respekt.cz/uzivatel/prihlaseni")
-            time.sleep(3)
+            self.driver.get(LOGIN_URL)
+            self.waiter.document_ready()
             logger.info(f"Přihlašovací stránka načtena, title: {self.driver.title}")
             
-            # Zkus najít formulář různými způsoby
-            email_field = None
-            selectors_email = ["input[name='email']", "input[type='email']", "#email", ".email"]
-            
-            for selector in selectors_email:
-                try:
-                    email_field = WebDriverWait(self.driver, 10).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    logger.info(f"Email pole nalezeno pomocí: {selector}")
-                    break
-                except TimeoutException:
-                    logger.info(f"Email pole nenalezeno pomocí: {selector}")
-                    continue
+            # Možné selektory polí formuláře - všechny se vyhodnotí v jednom požadavku
+            # Úrovně kvality: obecné id/třídy se zkoušejí až po přesných selektorech
+            selectors_email = [["input[name='email']", "input[type='email']"], ["#email", ".email"]]
+            selectors_password = [["input[name='password']", "input[type='password']"], ["#password", ".password"]]
+            submit_selectors = [
+                [
+                    "button[type='submit']",
+                    "input[type='submit']", 
+                    "button:contains('Přihlásit')"
+                ],
+                [
+                    ".submit-button",
+                    ".login-button",
+                    # Záloha podle textu
+                    "//button[contains(text(), 'Přihlásit') or contains(text(), 'Login')]"
+                ]
+            ]
             
-            if not email_field:
+            # Počkej, až se objeví email pole, a rovnou získej i ostatní pole
+            # (zásah se počítá jen pro shodu, kterou jde vyplnit nebo odeslat)
+            fields = self.waiter.wait_for_groups({
+                'email': selectors_email,
+                'password': selectors_password,
+                'submit': submit_selectors
+            }, 'login_form', required='email', usable={
+                'email': lambda match: match['tag'] == 'input',
+                'password': lambda match: match['tag'] == 'input',
+                'submit': lambda match: match['tag'] in ('button', 'input')
+            })
+            
+            if not fields:
                 logger.error("Nenašel jsem email pole")
                 self.save_debug_info("login_page_no_email")
                 return False
+            logger.info(f"Email pole nalezeno pomocí: {fields['email']['selector']}")
             
-            # Hledej password pole
-            password_field = None
-            selectors_password = ["input[name='password']", "input[type='password']", "#password", ".password"]
-            
-            for selector in selectors_password:
-                try:
-                    password_field = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    logger.info(f"Password pole nalezeno pomocí: {selector}")
-                    break
-                except NoSuchElementException:
-                    continue
-            
-            if not password_field:
+            if not fields['password']:
                 logger.error("Nenašel jsem password pole")
                 return False
+            logger.info(f"Password pole nalezeno pomocí: {fields['password']['selector']}")
+            
+            if not fields['submit']:
+                logger.error("Nenašel jsem submit button")
+                return False
+            logger.info(f"Submit button nalezen pomocí: {fields['submit']['selector']}")
             
             # Vyplň přihlašovací údaje
             logger.info("Vyplňuji přihlašovací údaje...")
+            email_field = fields['email']['element']
+            password_field = fields['password']['element']
             email_field.clear()
             email_field.send_keys(RESPEKT_LOGIN)
             password_field.clear()
             password_field.send_keys(RESPEKT_PASSWORD)
             
-            # Najdi a klikni submit button
-            submit_selectors = [
-                "button[type='submit']",
-                "input[type='submit']", 
-                "button:contains('Přihlásit')",
-                ".submit-button",
-                ".login-button"
+            # Kontrola různých indikátorů úspěšného přihlášení
+            logout_indicator = "//a[contains(@href, 'odhlaseni') or contains(text(), 'Odhlásit')]"
+            login_indicators = [
+                "//a[contains(@href, 'muj-ucet') or contains(text(), 'Můj účet')]",
+                "//a[contains(@href, 'archiv') or contains(text(), 'Archiv')]",
+                logout_indicator,
+                "//div[contains(@class, 'user') or contains(@class, 'profile')]"
             ]
             
-            submit_button = None
-            for selector in submit_selectors:
-                try:
-                    submit_button = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    logger.info(f"Submit button nalezen pomocí: {selector}")
-                    break
-                except NoSuchElementException:
-                    continue
-            
-            if not submit_button:
-                # Zkus najít pomocí textu
-                try:
-                    submit_button = self.driver.find_element(By.XPATH, "//button[contains(text(), 'Přihlásit') or contains(text(), 'Login')]")
-                    logger.info("Submit button nalezen pomocí XPath")
-                except NoSuchElementException:
-                    logger.error("Nenašel jsem submit button")
-                    return False
-            
             # Klikni na submit
             logger.info("Odesílám přihlašovací formulář...")
-            submit_button.click()
+            login_page_url = self.driver.current_url
+            fields['submit']['element'].click()
             
-            # Počkaj na přesměrování
-            time.sleep(5)
+            # Počkej na přesměrování (nebo na odkaz pro odhlášení, pokud web nepřesměrovává)
+            self.waiter.url_change(login_page_url, 'login_submit', [logout_indicator])
+            self.waiter.document_ready()
+            self.waiter.network_idle()
             
             # Zkontroluj přihlášení
             current_url = self.driver.current_url
             logger.info(f"Aktuální URL po přihlášení: {current_url}")
             
-            # Kontrola různých indikátorů úspěšného přihlášení
-            login_indicators = [
-                "//a[contains(@href, 'muj-ucet') or contains(text(), 'Můj účet')]",
-                "//a[contains(@href, 'archiv') or contains(text(), 'Archiv')]",
-                "//a[contains(@href, 'odhlaseni') or contains(text(), 'Odhlásit')]",
-                "//div[contains(@class, 'user') or contains(@class, 'profile')]"
-            ]
-            
-            for indicator in login_indicators:
-                try:
-                    element = self.driver.find_element(By.XPATH, indicator)
-                    logger.info(f"✅ Přihlášení potvrzeno - nalezen element: {element.text}")
-                    return True
-                except NoSuchElementException:
-                    continue
+            indicator = self.waiter.find_first(login_indicators, 'login_check')
+            if indicator:
+                logger.info(f"✅ Přihlášení potvrzeno - nalezen element: {indicator['text']}")
+                return True
             
             # Pokud jsme nebyli přesměrováni zpět na login, považujme to za úspěch
             if "prihlaseni" not in current_url:
@@ -234,6 +2251,8 @@ class RespektDownloader:
                 
         except Exception as e:
             logger.error(f"❌ Chyba při přihlašování: {e}")
+            if self.driver is None:
+                return False
             try:
                 logger.error(f"Aktuální URL: {self.driver.current_url}")
                 logger.error(f"Page title: {self.driver.title}")
@@ -241,46 +2260,31 @@ class RespektDownloader:
                 pass
             return False
     
+    @traced('discovery')
     def find_current_issue(self):
-        """🎯 Najde aktuální vydání pomocí přímých URL"""
+        """🎯 Najde aktuální vydání - strategie závodí souběžně a vyhraje první potvrzená odpověď"""
         try:
             logger.info("🔍 Hledám aktuální vydání...")
-            logger.info("🚀 Používám novou strategii přímých URL!")
-            
-            # Strategie 1: Zkusit přímo nejnovější vydání
-            current_year = datetime.now().year
-            logger.info(f"📅 Aktuální rok: {current_year}")
-            
-            # Začni od čísla 35 (víme, že existuje) a zkus okolní čísla
-            issue_numbers = [35, 36, 34, 37, 33, 38, 32, 39, 31, 40]
-            
-            for issue_num in issue_numbers:
-                test_url = f"https://www.respekt.cz/tydenik/{current_year}/{issue_num}"
-                logger.info(f"🧪 Testuji vydání {issue_num}/2025: {test_url}")
-                
-                try:
-                    self.driver.get(test_url)
-                    time.sleep(3)
-                    
-                    title = self.driver.title
-                    logger.info(f"📄 Title stránky: {title}")
-                    
-                    # Zkontroluj validitu stránky
-                    if "404" not in title and "RESPEKT" in title and title != "RESPEKT":
-                        logger.info(f"✅ Nalezeno funkční vydání {issue_num}/2025!")
-                        logger.info(f"🎉 URL: {test_url}")
-                        return test_url
-                    else:
-                        logger.info(f"❌ Vydání {issue_num}/2025 neexistuje nebo je prázdné")
-                        
-                except Exception as e:
-                    logger.warning(f"⚠️ Chyba při testování vydání {issue_num}: {e}")
-                    continue
             
-            logger.error("❌ Žádné přímé URL nevyhovovalo!")
-            logger.info("🔄 Zkouším záložní metody...")
-            
-            # Strategie 2: Zkus archiv
+            last_confirmed = load_state(ISSUE_CACHE_FILE)
+            year, predicted = predict_issue(last_confirmed=last_confirmed)
+            logger.info(f"🔮 Odhad aktuálního vydání: {predicted}/{year}")
+            
+            found = self._run_async(self._arace_discovery(year, predicted))
+            if found:
+                year, issue_num = found
+                issue_url = self._issue_url(year, issue_num)
+                logger.info(f"✅ Nalezeno funkční vydání {issue_num}/{year}!")
+                logger.info(f"🎉 URL: {issue_url}")
+                save_state(ISSUE_CACHE_FILE, {
+                    'year': year,
+                    'issue': issue_num,
+                    'confirmed_on': date.today().isoformat()
+                })
+                return issue_url
+            
+            logger.error("❌ Žádná strategie vydání nepotvrdila!")
+            logger.info("🔄 Zkouším archiv v prohlížeči...")
             return self._find_issue_from_archive()
             
         except Exception as e:
@@ -288,34 +2292,163 @@ class RespektDownloader:
             self.save_debug_info("find_issue_error")
             return None
     
+    async def _arace_discovery(self, year, predicted):
+        """🏁 Spustí všechny strategie najednou, vezme první potvrzené vydání a ostatní zruší"""
+        probes = IssueProbes(self)
+        started = time.monotonic()
+        tasks = {
+            asyncio.ensure_future(self._arun_strategy(strategy, probes, year, predicted)): strategy.name
+            for strategy in self.discovery_strategies
+        }
+        outcomes = {}
+        winner = None
+        pending = set(tasks)
+        
+        try:
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result, outcome, elapsed = task.result()
+                    if result and winner is None:
+                        winner, outcome = result, 'win'
+                        logger.info(f"🏆 Vyhrála strategie {tasks[task]} za {elapsed:.2f} s")
+                    outcomes[tasks[task]] = outcome, elapsed
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            probes.cancel()
+        
+        # Předběhnuté strategie běžely až do zrušení
+        cancelled_after = time.monotonic() - started
+        for name in tasks.values():
+            self.discovery_stats.record(name, *outcomes.get(name, ('lost', cancelled_after)))
+        self.discovery_stats.save()
+        logger.info(f"📊 Hledání vydání: {len(probes.tasks)} ověřených URL, "
+                    f"úspěšnost strategií: {self.discovery_stats.summary()}")
+        return winner
+    
+    async def _arun_strategy(self, strategy, probes, year, predicted):
+        """Spustí strategii s jejím časovým limitem, vrátí (vydání nebo None, výsledek, doba běhu)"""
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(
+                strategy.discover(self, probes, year, predicted),
+                DISCOVERY_TIMEOUTS.get(strategy.name, WAIT_TIMEOUTS['page_load'])
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ Strategie {strategy.name}: vypršel časový limit")
+            return None, 'timeout', time.monotonic() - started
+        except Exception as e:
+            logger.warning(f"⚠️ Strategie {strategy.name} selhala: {e}")
+            return None, 'error', time.monotonic() - started
+        
+        elapsed = time.monotonic() - started
+        if result is None:
+            logger.info(f"Strategie {strategy.name} nic nepotvrdila ({elapsed:.2f} s)")
+            return None, 'miss', elapsed
+        logger.info(f"🔎 Strategie {strategy.name}: vydání {result[1]}/{result[0]} ({elapsed:.2f} s)")
+        return result, 'lost', elapsed
+    
+    async def _afind_latest_issue(self, year, start, probes=None):
+        """🔎 Najde nejvyšší existující číslo roku galopujícím a binárním hledáním od odhadu
+        
+        Chyba ověření (IOError z IssueProbes) se propaguje - nezjištěné číslo není chybějící.
+        """
+        probes = probes or IssueProbes(self)
+        start = min(max(start, 1), MAX_ISSUES_PER_YEAR)
+        checked = set()
+        
+        async def exists(issue_num):
+            if 1 <= issue_num <= MAX_ISSUES_PER_YEAR:
+                checked.add(issue_num)
+            return await probes.exists(year, issue_num)
+        
+        # Odhad a jeho sousedy ověř najednou - při správném odhadu stačí jedno kolo
+        neighbours = [num for num in (start - 1, start, start + 1) if 1 <= num <= MAX_ISSUES_PER_YEAR]
+        logger.info(f"🧪 Testuji souběžně vydání {neighbours} ({year})...")
+        await asyncio.gather(*(exists(num) for num in neighbours))
+        
+        if await exists(start):
+            # Galopuj nahoru, dokud čísla existují
+            low, step = start, 1
+            while await exists(start + step):
+                low = start + step
+                step *= 2
+            high = start + step
+        else:
+            # Galopuj dolů k nějakému existujícímu číslu
+            high, step = start, 1
+            while not await exists(start - step):
+                high = start - step
+                step *= 2
+            low = max(start - step, 0)
+        
+        # Binární hledání mezi existujícím (low) a neexistujícím (high) číslem
+        while high - low > 1:
+            middle = (low + high) // 2
+            if await exists(middle):
+                low = middle
+            else:
+                high = middle
+        
+        logger.info(f"📊 Hledání vydání v roce {year}: {len(checked)} ověřených URL")
+        return low if low >= 1 else None
+    
+    @staticmethod
+    def _issue_url(year, issue_num):
+        """Vrátí URL stránky vydání"""
+        return f"{BASE_URL}/tydenik/{year}/{issue_num}"
+    
+    @staticmethod
+    def _is_valid_issue_title(title):
+        """Stránka existujícího vydání má v titulku víc než jen 'RESPEKT'"""
+        return "404" not in title and "RESPEKT" in title and title != "RESPEKT"
+    
+    async def _aprobe_issue(self, year, issue_num):
+        """Ověří jedním HTTP požadavkem, jestli vydání existuje"""
+        status, text = await self._http().get_text(self._issue_url(year, issue_num))
+        if status == 404:
+            return False
+        if status >= 400:
+            raise IOError(f"HTTP {status}")
+        
+        match = re.search(r'<title[^>]*>(.*?)</title>', text, re.IGNORECASE | re.DOTALL)
+        title = html.unescape(match.group(1)).strip() if match else ''
+        logger.debug(f"📄 Title vydání {issue_num}/{year}: {title}")
+        if not self._is_valid_issue_title(title):
+            return False
+        
+        # Stránka je už stažená - issueId si rovnou zapiš do indexu
+        issue_id = self._extract_issue_id(text)
+        if issue_id:
+            self.issue_index.add(year, issue_num, issue_id)
+        return True
+    
     def _find_issue_from_archive(self):
         """Záložní metoda - hledání v archivu"""
         try:
             logger.info("📚 Zkouším archiv jako záložní možnost...")
+            self._ensure_browser()
             
             current_year = datetime.now().year
-            archive_url = f"https://www.respekt.cz/archiv/{current_year}"
+            archive_url = f"{BASE_URL}/archiv/{current_year}"
             self.driver.get(archive_url)
-            time.sleep(5)
+            self.waiter.document_ready()
             
             logger.info(f"Archive načten: {self.driver.title}")
             
-            # Hledej odkazy na vydání
+            # Hledej odkazy na vydání - letošní ročník vždy před obecným odkazem
             selectors = [
-                f"//a[contains(@href, '/tydenik/{current_year}/')]",
-                "//a[contains(@href, '/tydenik/')]"
+                [f"//a[contains(@href, '/tydenik/{current_year}/')]"],
+                ["//a[contains(@href, '/tydenik/')]"]
             ]
             
-            for selector in selectors:
-                try:
-                    issues = self.driver.find_elements(By.XPATH, selector)
-                    if issues:
-                        issue_url = issues[0].get_attribute('href')
-                        logger.info(f"✅ Nalezeno v archivu: {issue_url}")
-                        return issue_url
-                except Exception as e:
-                    logger.debug(f"Selektor {selector} selhal: {e}")
-                    continue
+            issue_link = self.waiter.any_selector(selectors, 'archive', usable=lambda match: bool(match['href']))
+            if issue_link and issue_link['href']:
+                issue_url = issue_link['href']
+                logger.info(f"✅ Nalezeno v archivu ({issue_link['selector']}): {issue_url}")
+                return issue_url
             
             logger.error("❌ Ani archiv nefunguje")
             return None
@@ -324,47 +2457,289 @@ class RespektDownloader:
             logger.error(f"💥 Chyba v archivu: {e}")
             return None
     
+    @traced('download')
     def download_epub(self, issue_url):
         """📥 Stáhne EPUB z dané stránky vydání"""
+        try:
+            epub_url = self._find_epub_url(issue_url)
+            if not epub_url:
+                return None
+            
+            # Stáhni pomocí autentizované session
+            self._sync_cookies_from_browser()
+            
+            headers = {
+                'Referer': issue_url,
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
+            }
+            
+            # Vytvoř název souboru
+            today = datetime.now().strftime("%Y-%m-%d")
+            filename = f"respekt_{today}.epub"
+            
+            logger.info(f"⬇️ Stahování EPUB...")
+            content_length, sha256 = self._run_async(self._http().download(epub_url, filename, headers))
+            logger.info(f"📊 Staženo {content_length} bytes (SHA-256 {sha256[:16]}…)")
+            
+            # Zapiš stažení do záznamu vydání
+            id_match = ISSUE_ID_PATTERN.search(epub_url)
+            issue_match = ISSUE_URL_PATTERN.search(issue_url)
+            self.last_download = {
+                'issue_id': id_match.group(1) if id_match else None,
+                'year': int(issue_match.group(1)) if issue_match else None,
+                'issue': int(issue_match.group(2)) if issue_match else None,
+                'sha256': sha256,
+                'size': content_length,
+                'file': filename
+            }
+            self.ledger.record_download(
+                self.last_download['issue_id'], sha256, content_length, filename,
+                self.last_download['year'], self.last_download['issue']
+            )
+            self.ledger.save()
+            
+            logger.info(f"✅ EPUB úspěšně stažen: {filename} ({content_length} bytes)")
+            return filename
+            
+        except Exception as e:
+            logger.error(f"💥 Chyba při stahování EPUB: {e}")
+            self.save_debug_info("epub_download_error")
+            return None
+    
+    def _find_epub_url(self, issue_url):
+        """🎯 Zjistí URL pro stažení EPUB - z indexu, z HTML stránky a až nakonec přes prohlížeč"""
+        parsed = ISSUE_URL_PATTERN.search(issue_url)
+        if parsed:
+            year, issue_num = int(parsed.group(1)), int(parsed.group(2))
+            issue_id = self.issue_index.get(year, issue_num)
+            if issue_id:
+                logger.info(f"🗂️ issueId vydání {issue_num}/{year} nalezeno v indexu")
+            else:
+                issue_id = self._fetch_issue_id(year, issue_num)
+            if issue_id:
+                epub_url = self._epub_api_url(issue_id)
+                logger.info(f"🎯 EPUB URL nalezena: {epub_url}")
+                return epub_url
+        
+        epub_url = self._find_epub_url_in_browser(issue_url)
+        if epub_url and parsed:
+            match = ISSUE_ID_PATTERN.search(epub_url)
+            if match:
+                self.issue_index.add(int(parsed.group(1)), int(parsed.group(2)), match.group(1))
+        return epub_url
+    
+    @staticmethod
+    def _epub_api_url(issue_id):
+        return f"{BASE_URL}/api/downloadEPub?issueId={issue_id}"
+    
+    @staticmethod
+    def _extract_issue_id(page_html):
+        """Najde issueId v odkazu nebo onclick na /api/downloadEPub"""
+        soup = bs4.BeautifulSoup(page_html, 'html.parser')
+        for element in soup.select("a[href*='downloadEPub'], [onclick*='downloadEPub']"):
+            match = ISSUE_ID_PATTERN.search(element.get('href') or element.get('onclick') or '')
+            if match:
+                return match.group(1)
+        
+        # Odkaz může být i ve skriptu nebo v datech stránky
+        match = ISSUE_ID_PATTERN.search(page_html)
+        return match.group(1) if match else None
+    
+    def _fetch_issue_id(self, year, issue_num):
+        """Zjistí issueId z HTML stránky vydání bez spouštění prohlížeče"""
+        return self._run_async(self._afetch_issue_id(year, issue_num))
+    
+    async def _afetch_issue_id(self, year, issue_num):
+        try:
+            status, text = await self._http().get_text(self._issue_url(year, issue_num))
+            if status >= 400:
+                raise IOError(f"HTTP {status}")
+        except Exception as e:
+            logger.warning(f"⚠️ Stránku vydání {issue_num}/{year} nelze stáhnout: {e}")
+            return None
+        
+        issue_id = self._extract_issue_id(text)
+        if issue_id:
+            self.issue_index.add(year, issue_num, issue_id)
+            logger.info(f"🗂️ issueId vydání {issue_num}/{year} nalezeno v HTML: {issue_id}")
+        else:
+            logger.info(f"HTML vydání {issue_num}/{year} odkaz na EPUB neobsahuje")
+        return issue_id
+    
+    async def _aarchive_issue_numbers(self, year):
+        """Vrátí čísla všech vydání roku podle stránky archivu"""
+        status, text = await self._http().get_text(f"{BASE_URL}/archiv/{year}")
+        if status >= 400:
+            raise IOError(f"HTTP {status}")
+        
+        soup = bs4.BeautifulSoup(text, 'html.parser')
+        issue_numbers = set()
+        for link in soup.find_all('a', href=True):
+            match = ISSUE_URL_PATTERN.search(link['href'])
+            if match and int(match.group(1)) == year:
+                issue_numbers.add(int(match.group(2)))
+        
+        return sorted(issue_numbers)
+    
+    async def _aindex_year(self, year):
+        """Doplní do indexu všechna vydání roku podle archivu"""
+        issue_numbers = await self._aarchive_issue_numbers(year)
+        
+        known = set(self.issue_index.numbers(year))
+        missing = sorted(set(issue_numbers) - known)
+        logger.info(f"📚 Archiv {year}: {len(issue_numbers)} vydání, v indexu chybí {len(missing)}")
+        
+        await asyncio.gather(*(self._afetch_issue_id(year, num) for num in missing))
+        return len(issue_numbers)
+    
+    @traced('backfill')
+    def backfill_index(self, years):
+        """🗂️ Doplní index issueId pro zadané roky (např. pro stažení starších čísel)"""
+        if not self.restore_session():
+            if not self.login():
+                return False
+            self.save_session()
+        
+        for year in years:
+            try:
+                self._run_async(self._aindex_year(year))
+            except Exception as e:
+                logger.error(f"💥 Archiv {year} nelze zpracovat: {e}")
+                return False
+            finally:
+                self.issue_index.save()
+        
+        logger.info(f"✅ Index obsahuje {len(self.issue_index.data)} vydání")
+        return True
+    
+    @traced('archive')
+    def archive_years(self, years, directory=ARCHIVE_DIR, workers=ARCHIVE_WORKERS, rate=ARCHIVE_RATE):
+        """📦 Stáhne všechna vydání zadaných roků přes sdílenou přihlášenou session
+        
+        Seznamy roků i vydání se zpracovávají souběžně v jednom event loopu, najednou
+        se stahuje nejvýš `workers` vydání, požadavky na jeden host omezuje `rate`
+        za sekundu a už stažená vydání (podle záznamu vydání a souboru na disku) přeskočí.
+        """
+        self._http(max(workers, PROBE_WORKERS)).limiter = RateLimiter(rate)
+        
+        if not self.restore_session():
+            if not self.login():
+                return False
+            self.save_session()
+        
+        return self._run_async(self._aarchive_years(years, directory, workers, rate))
+    
+    async def _aarchive_years(self, years, directory, workers, rate):
+        semaphore = asyncio.Semaphore(workers)
+        counts = {'downloaded': 0, 'skipped': 0, 'failed': 0}
+        progress = {'done': 0, 'total': 0, 'bytes': 0}
+        started = time.monotonic()
+        issue_tasks = []
+        logger.info(f"📦 Stahuji archiv {', '.join(map(str, years))}: {workers} souběžně, max {rate:g} požadavků/s")
+        
+        async def archive_issue(year, issue_num):
+            async with semaphore:
+                try:
+                    status, size = await self._aarchive_issue(year, issue_num, directory)
+                except Exception as e:
+                    logger.error(f"💥 Vydání {issue_num}/{year} selhalo: {e}")
+                    status, size = 'failed', 0
+            
+            counts[status] += 1
+            progress['done'] += 1
+            progress['bytes'] += size
+            elapsed = time.monotonic() - started
+            logger.info(f"📦 [{progress['done']}/{progress['total']}] {issue_num}/{year}: {status} "
+                        f"({progress['bytes'] / 1e6:.1f} MB, {elapsed:.0f} s)")
+        
+        async def archive_year(year):
+            try:
+                issue_numbers = await self._aarchive_issue_numbers(year)
+            except Exception as e:
+                logger.warning(f"⚠️ Archiv {year} nelze načíst: {e}")
+                issue_numbers = []
+            
+            if not issue_numbers:
+                # Bez seznamu v archivu najdi poslední číslo roku přímo
+                try:
+                    latest = await self._afind_latest_issue(year, 52)
+                except IOError as e:
+                    logger.warning(f"⚠️ Poslední vydání roku {year} nelze zjistit: {e}")
+                    latest = None
+                issue_numbers = list(range(1, latest + 1)) if latest else []
+            
+            logger.info(f"📚 Rok {year}: {len(issue_numbers)} vydání")
+            # Vydání roku se začnou stahovat hned, nečeká se na seznamy ostatních roků
+            progress['total'] += len(issue_numbers)
+            issue_tasks.extend(asyncio.create_task(archive_issue(year, num)) for num in issue_numbers)
+        
+        await asyncio.gather(*(archive_year(year) for year in years))
+        await asyncio.gather(*issue_tasks)
+        
+        self.ledger.save()
+        elapsed = time.monotonic() - started
+        total_bytes = progress['bytes']
+        logger.info(f"✅ Archiv hotov za {elapsed:.0f} s: staženo {counts['downloaded']}, "
+                    f"přeskočeno {counts['skipped']}, selhalo {counts['failed']}, "
+                    f"{total_bytes / 1e6:.1f} MB ({total_bytes / 1e6 / max(elapsed, 0.001):.2f} MB/s)")
+        return counts['failed'] == 0
+    
+    async def _aarchive_issue(self, year, issue_num, directory):
+        """Stáhne jedno vydání do archivu, vrátí (stav, počet bytů)"""
+        target = os.path.join(directory, str(year), f"respekt_{year}_{issue_num:02d}.epub")
+        
+        issue_id = self.issue_index.get(year, issue_num) or await self._afetch_issue_id(year, issue_num)
+        if not issue_id:
+            logger.error(f"❌ Vydání {issue_num}/{year}: issueId nenalezeno")
+            return 'failed', 0
+        
+        entry = self.ledger.data.get(issue_id)
+        if entry and entry.get('file') == target and os.path.exists(target):
+            return 'skipped', 0
+        
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        headers = {'Referer': self._issue_url(year, issue_num)}
+        size, sha256 = await self._http().download(self._epub_api_url(issue_id), target, headers)
+        
+        self.ledger.record_download(issue_id, sha256, size, target, year, issue_num)
+        self.ledger.save()
+        return 'downloaded', size
+    
+    def _find_epub_url_in_browser(self, issue_url):
+        """Najde odkaz na EPUB ve stránce vydání vykreslené prohlížečem"""
         try:
             logger.info(f"📖 Otevírám stránku vydání: {issue_url}")
+            self._ensure_browser()
             self.driver.get(issue_url)
-            time.sleep(3)
+            self.waiter.document_ready()
             
             logger.info(f"📄 Stránka vydání načtena, title: {self.driver.title}")
             
             # Hledej EPUB download - víme přesný formát API
+            # Úrovně kvality: selektory s URL API vždy před nouzovými podle textu
             epub_selectors = [
-                "//a[contains(@href, '/api/downloadEPub')]",
-                "//button[contains(@onclick, '/api/downloadEPub')]",
-                "//button[contains(text(), 'Stáhnout epub')]",
-                "//a[contains(text(), 'Stáhnout epub')]",
-                "//button[contains(text(), 'EPUB')]",
-                "//a[contains(text(), 'EPUB')]",
-                "button[onclick*='downloadEPub']",
-                "a[href*='/api/downloadEPub']"
+                [
+                    "//a[contains(@href, '/api/downloadEPub')]",
+                    "//button[contains(@onclick, '/api/downloadEPub')]",
+                    "button[onclick*='downloadEPub']",
+                    "a[href*='/api/downloadEPub']"
+                ],
+                [
+                    "//button[contains(text(), 'Stáhnout epub')]",
+                    "//a[contains(text(), 'Stáhnout epub')]",
+                    "//button[contains(text(), 'EPUB')]",
+                    "//a[contains(text(), 'EPUB')]"
+                ]
             ]
             
-            epub_element = None
-            found_selector = None
-            
-            for selector in epub_selectors:
-                try:
-                    if selector.startswith("//"):
-                        elements = self.driver.find_elements(By.XPATH, selector)
-                    else:
-                        elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    
-                    if elements:
-                        epub_element = elements[0]
-                        found_selector = selector
-                        logger.info(f"📥 EPUB element nalezen: {selector}")
-                        logger.info(f"📝 Text elementu: '{epub_element.text.strip()}'")
-                        break
-                        
-                except Exception as e:
-                    logger.debug(f"Selektor {selector} selhal: {e}")
-                    continue
+            # Počkej, až stránka vykreslí kterýkoli z EPUB prvků - text, href i onclick
+            # přijdou v jedné odpovědi spolu s nalezeným elementem; zásah je jen shoda s URL
+            epub_element = self.waiter.any_selector(epub_selectors, 'issue_page', usable=lambda match: bool(
+                match['href'] or (match['onclick'] and ISSUE_ID_PATTERN.search(match['onclick']))
+            ))
+            if epub_element:
+                logger.info(f"📥 EPUB element nalezen: {epub_element['selector']}")
+                logger.info(f"📝 Text elementu: '{epub_element['text']}'")
             
             if not epub_element:
                 logger.error("❌ Nenašel jsem EPUB odkaz!")
@@ -372,15 +2747,15 @@ class RespektDownloader:
                 return None
             
             # Získej URL pro stažení
-            epub_url = epub_element.get_attribute('href')
+            epub_url = epub_element['href']
             
             if not epub_url:
                 # Zkus extrahovat z onclick
-                onclick_attr = epub_element.get_attribute('onclick')
+                onclick_attr = epub_element['onclick']
                 if onclick_attr and 'downloadEPub' in onclick_attr:
-                    match = re.search(r'/api/downloadEPub\?issueId=([a-f0-9-]+)', onclick_attr)
+                    match = ISSUE_ID_PATTERN.search(onclick_attr)
                     if match:
-                        epub_url = f"https://www.respekt.cz/api/downloadEPub?issueId={match.group(1)}"
+                        epub_url = self._epub_api_url(match.group(1))
                         logger.info(f"📄 URL extrahovana z onclick: {epub_url}")
                 
                 if not epub_url:
@@ -388,86 +2763,178 @@ class RespektDownloader:
                     return None
             
             logger.info(f"🎯 EPUB URL nalezena: {epub_url}")
-            
-            # Stáhni pomocí autentizované session
-            cookies = self.driver.get_cookies()
-            session = requests.Session()
-            
-            for cookie in cookies:
-                session.cookies.set(cookie['name'], cookie['value'])
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Referer': issue_url,
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
-            }
-            
-            logger.info(f"⬇️ Stahování EPUB...")
-            response = session.get(epub_url, headers=headers)
-            response.raise_for_status()
-            
-            content_length = len(response.content)
-            logger.info(f"📊 Staženo {content_length} bytes")
-            
-            if content_length < 1000:
-                logger.warning(f"⚠️ Podezřele malý soubor ({content_length} bytes)")
-                logger.info(f"Response: {response.text[:500]}")
-            
-            # Vytvoř název souboru
-            today = datetime.now().strftime("%Y-%m-%d")
-            filename = f"respekt_{today}.epub"
-            
-            with open(filename, 'wb') as f:
-                f.write(response.content)
-            
-            logger.info(f"✅ EPUB úspěšně stažen: {filename} ({content_length} bytes)")
-            return filename
+            return epub_url
             
         except Exception as e:
-            logger.error(f"💥 Chyba při stahování EPUB: {e}")
-            self.save_debug_info("epub_download_error")
+            logger.error(f"💥 Chyba při hledání EPUB odkazu: {e}")
+            self.save_debug_info("issue_page_error")
             return None
     
-    def send_to_kindle(self, epub_file):
-        """📧 Odešle EPUB na Kindle"""
+    @traced('smtp_connect')
+    def _smtp_connect(self):
+        """Otevře přihlášené SMTP spojení"""
+        if self.cassette is not None and self.cassette.replaying and SMTP_HOST not in LOOPBACK_HOSTS:
+            raise smtplib.SMTPConnectError(-1, f"📼 Při přehrávání se na {SMTP_HOST} neodesílá - nastav SMTP_HOST na lokální server")
+        server = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=HTTP_TIMEOUT)
         try:
-            logger.info(f"📤 Odesílám {epub_file} na Kindle ({KINDLE_EMAIL})...")
-            
-            msg = MIMEMultipart()
-            msg['From'] = GMAIL_EMAIL
-            msg['To'] = KINDLE_EMAIL
-            msg['Subject'] = f"Respekt - {datetime.now().strftime('%d.%m.%Y')}"
-            
-            with open(epub_file, "rb") as attachment:
-                part = MIMEBase('application', 'epub+zip')
-                part.set_payload(attachment.read())
-            
-            encoders.encode_base64(part)
-            part.add_header('Content-Disposition', f'attachment; filename="{epub_file}"')
-            msg.attach(part)
-            
-            with smtplib.SMTP('smtp.gmail.com', 587) as server:
+            if SMTP_STARTTLS:
                 server.starttls()
-                server.login(GMAIL_EMAIL, GMAIL_APP_PASSWORD)
-                server.send_message(msg)
+            server.login(GMAIL_EMAIL, GMAIL_APP_PASSWORD)
+        except BaseException:
+            server.close()
+            raise
+        return server
+    
+    @traced('smtp_delivery')
+    def deliver(self, epub_file, recipients, filename=None):
+        """📬 Doručí EPUB příjemcům přes jedno SMTP spojení, vrátí {příjemce: chyba nebo None}
+        
+        Příloha se zakóduje jen jednou, každý příjemce dostane vlastní zprávu
+        (vlastní To a Message-ID). Po výpadku spojení se jednou připojí znovu.
+        """
+        from email.utils import formatdate, make_msgid
+        
+        results = {}
+        server = None
+        
+        try:
+            with EncodedAttachment(epub_file, filename) as attachment:
+                for recipient in recipients:
+                    for attempt in (1, 2):
+                        if server is None:
+                            try:
+                                server = self._smtp_connect()
+                            except (smtplib.SMTPException, OSError) as e:
+                                # Bez spojení nemá smysl zkoušet další příjemce
+                                logger.error(f"💥 Připojení k SMTP serveru selhalo: {e}")
+                                delivered = {address for address, error in results.items() if error is None}
+                                for pending in recipients:
+                                    if pending not in delivered:
+                                        results[pending] = f"SMTP spojení selhalo: {e}"
+                                return results
+                        
+                        headers = {
+                            'From': GMAIL_EMAIL,
+                            'To': recipient,
+                            'Subject': f"Respekt - {datetime.now().strftime('%d.%m.%Y')}",
+                            'Date': formatdate(localtime=True),
+                            'Message-ID': make_msgid(domain=GMAIL_EMAIL.split('@')[-1])
+                        }
+                        
+                        try:
+                            send_streaming(server, GMAIL_EMAIL, [recipient], attachment.iter_message(headers))
+                            results[recipient] = None
+                            logger.info(f"✅ Odesláno na {recipient}")
+                            break
+                        except smtplib.SMTPServerDisconnected as e:
+                            # Socket starého spojení se zavře hned, ne až v garbage collectoru
+                            server.close()
+                            server = None
+                            results[recipient] = str(e)
+                            logger.warning(f"⚠️ SMTP spojení spadlo při odesílání na {recipient} ({e})")
+                        except smtplib.SMTPException as e:
+                            results[recipient] = str(e)
+                            logger.error(f"💥 Odeslání na {recipient} selhalo: {e}")
+                            break
+        
+        except OSError as e:
+            logger.error(f"💥 Chyba při přípravě emailu: {e}")
+            for recipient in recipients:
+                results.setdefault(recipient, str(e))
+        
+        finally:
+            if server is not None:
+                try:
+                    server.quit()
+                except (smtplib.SMTPException, OSError):
+                    pass
+        
+        return results
+    
+    @traced('outbox')
+    def drain_outbox(self, max_wait=0, job_id=None):
+        """📮 Odešle čekající zásilky z fronty, vrátí True, pokud ve frontě nic nezbylo
+        
+        Zásilky, jejichž další pokus připadá do `max_wait` sekund, počká a zkusí znovu.
+        S `job_id` se čeká jen na tuto zásilku a výsledek říká, jestli byla doručena -
+        starší zásilky se zkusí taky, ale průchod neshodí.
+        """
+        deadline = time.time() + max_wait
+        
+        while True:
+            for job in self.outbox.jobs('pending'):
+                if job['next_attempt_at'] <= time.time():
+                    self._deliver_job(job)
+            
+            pending = self.outbox.jobs('pending')
+            if job_id is not None:
+                target = self.outbox.get(job_id)
+                if target is None or target['status'] != 'pending':
+                    if pending:
+                        logger.warning(f"📮 Ve frontě zůstávají jiné zásilky ({len(pending)}): "
+                                       f"{', '.join(job['id'] for job in pending)}")
+                    return target is None
+                pending = [target]
+            elif not pending:
+                return True
             
-            logger.info("✅ Email úspěšně odeslán na Kindle!")
-            return True
+            next_attempt_at = min(job['next_attempt_at'] for job in pending)
+            if next_attempt_at > deadline:
+                wait_minutes = max(0, next_attempt_at - time.time()) / 60
+                logger.warning(f"📮 Ve frontě zbývá {len(pending)} zásilek, další pokus za {wait_minutes:.0f} min")
+                return False
             
-        except Exception as e:
-            logger.error(f"💥 Chyba při odesílání emailu: {e}")
-            return False
+            time.sleep(max(0, next_attempt_at - time.time()))
+    
+    def _deliver_job(self, job):
+        """Zkusí doručit jednu zásilku a podle výsledku ji dokončí nebo přeplánuje"""
+        logger.info(f"📮 Doručuji zásilku {job['id']} (pokus {job['attempts'] + 1}/{OUTBOX_MAX_ATTEMPTS})...")
+        results = self.deliver(job['file'], job['recipients'], job['filename'])
+        failed = {recipient: error for recipient, error in results.items() if error}
+        job['delivered'] += [recipient for recipient, error in results.items() if error is None]
+        
+        if not failed:
+            self.ledger.record_delivery(job['issue_id'], job['sha256'])
+            self.ledger.save()
+            self.outbox.complete(job)
+            logger.info(f"✅ Zásilka {job['id']} doručena ({', '.join(job['delivered'])})")
+            return True
+        
+        job['recipients'] = list(failed)
+        job['attempts'] += 1
+        job['last_error'] = '; '.join(f"{recipient}: {error}" for recipient, error in failed.items())
+        
+        if job['attempts'] >= OUTBOX_MAX_ATTEMPTS:
+            job['status'] = 'dead'
+            logger.error(f"💀 Zásilka {job['id']} vzdána po {job['attempts']} pokusech: {job['last_error']}")
+        else:
+            delay = retry_delay(job['attempts'])
+            job['next_attempt_at'] = time.time() + delay
+            logger.warning(f"⚠️ Zásilka {job['id']} nedoručena, další pokus za {delay:.0f} s")
+        
+        self.outbox.update(job)
+        return False
     
-    def run(self):
-        """🚀 Hlavní metoda - spustí celý proces"""
+    def run(self, force=False):
+        """🚀 Hlavní metoda - spustí celý proces jednou a uklidí (force = ignoruje záznam o doručení)"""
+        logger.info("🎬 === Spouštím Respekt EPUB Downloader v3.0 - NOVÁ VERZE ===")
+        logger.info("📦 Verze: Přímé URL strategie s backup systémem (build 20250825)")
+        logger.info("🚀 Nový algoritmus pro hledání vydání aktivní!")
+        success = False
+        try:
+            success = self.run_once(force)
+            return success
+        finally:
+            if not success:
+                self.debug_capture.flush()
+            self.close()
+    
+    @traced('run')
+    def run_once(self, force=False, outbox_wait=OUTBOX_INLINE_WAIT):
+        """Jeden průchod: fronta, přihlášení, hledání, stažení a doručení - bez úklidu zdrojů"""
         try:
-            logger.info("🎬 === Spouštím Respekt EPUB Downloader v3.0 - NOVÁ VERZE ===")
-            logger.info("📦 Verze: Přímé URL strategie s backup systémem (build 20250825)")
-            logger.info("🚀 Nový algoritmus pro hledání vydání aktivní!")
-            
             # Kontrola proměnných prostředí
-            required_vars = ['RESPEKT_LOGIN', 'RESPEKT_PASSWORD', 'GMAIL_EMAIL', 'GMAIL_APP_PASSWORD', 'KINDLE_EMAIL']
-            missing_vars = [var for var in required_vars if not os.getenv(var)]
+            missing_vars = missing_config()
             
             if missing_vars:
                 logger.error(f"❌ Chybí proměnné prostředí: {', '.join(missing_vars)}")
@@ -475,30 +2942,77 @@ class RespektDownloader:
             
             logger.info("✅ Všechny proměnné prostředí jsou nastavené")
             
-            # 1. Přihlášení
-            if not self.login():
-                return False
+            # 0. Nejdřív dořeš zásilky z minulých běhů - bez přihlašování a stahování
+            self.drain_outbox()
+            
+            # Opakované spuštění v cyklu, jehož vydání už je doručené, skončí jediným dotazem do záznamu
+            if not force and self._cycle_delivered(publication_cycle_start(datetime.now())):
+                logger.info("📒 Vydání aktuálního cyklu už bylo doručeno - není co dělat")
+                return True
+            
+            # 1. Přihlášení (platná uložená session ho přeskočí, démon ho drží mezi průchody)
+            if not self.authenticated:
+                if not self.restore_session():
+                    if not self.login():
+                        return False
+                    self.save_session()
+                self.authenticated = True
             
             # 2. Najdi aktuální vydání
             issue_url = self.find_current_issue()
             if not issue_url:
+                # Session mohla vypršet - příští průchod se přihlásí znovu
+                self.authenticated = False
                 return False
             
+            issue_match = ISSUE_URL_PATTERN.search(issue_url)
+            if issue_match and not force:
+                year, issue_num = int(issue_match.group(1)), int(issue_match.group(2))
+                
+                # Už doručené vydání se znovu nestahuje ani neposílá
+                delivered = self.ledger.find_delivered(
+                    issue_id=self.issue_index.get(year, issue_num), year=year, issue_num=issue_num
+                )
+                if delivered:
+                    logger.info(f"📒 Vydání {issue_num}/{year} už bylo doručeno ({delivered['delivered_at']}) - není co dělat")
+                    return True
+                
+                # Vydání čekající ve frontě se jen znovu zkusí doručit
+                job = self.outbox.find(year, issue_num)
+                if job:
+                    logger.info(f"📮 Vydání {issue_num}/{year} už čeká ve frontě - stahování přeskočeno")
+                    if job['status'] == 'dead':
+                        job.update(status='pending', attempts=0, next_attempt_at=time.time())
+                        self.outbox.update(job)
+                    return self.drain_outbox(max_wait=outbox_wait, job_id=job['id'])
+            
             # 3. Stáhni EPUB
             epub_file = self.download_epub(issue_url)
             if not epub_file:
+                self.authenticated = False
                 return False
             
-            # 4. Odešli na Kindle
-            success = self.send_to_kindle(epub_file)
+            # Server mohl během běhu cookies obnovit
+            self.save_session()
             
+            # Stejný obsah pod jinou adresou už taky nemá smysl posílat
+            download = self.last_download
+            delivered = self.ledger.find_delivered(issue_id=download['issue_id'], sha256=download['sha256'])
+            if delivered and not force:
+                logger.info(f"📒 Identický EPUB už byl doručen ({delivered['delivered_at']}) - neodesílám")
+                os.remove(epub_file)
+                return True
+            
+            # 4. Zařaď do fronty a odešli na Kindle (neúspěch už neznamená nové stahování)
+            job = self.outbox.enqueue(
+                epub_file, KINDLE_RECIPIENTS, download['issue_id'], download['sha256'],
+                download['year'], download['issue']
+            )
+            logger.info(f"📮 EPUB zařazen do fronty doručení: {job['id']}")
+            
+            success = self.drain_outbox(max_wait=outbox_wait, job_id=job['id'])
             if success:
                 logger.info("🎉 === Proces úspěšně dokončen! ===")
-                try:
-                    os.remove(epub_file)
-                    logger.info(f"🗑️ Místní soubor {epub_file} smazán")
-                except:
-                    pass
             
             return success
             
@@ -507,15 +3021,261 @@ class RespektDownloader:
             return False
         
         finally:
-            if self.driver:
-                self.driver.quit()
+            # Teplý prohlížeč démona by jinak hromadil síťové události až do ukončení
+            self._report_browser_traffic()
+    
+    def daemon(self, warm_browser=False):
+        """🕰️ Běží trvale a hlídá nová vydání s teplou session (a volitelně i prohlížečem)
+        
+        Mimo cyklus vydání spí, od předstihu před očekávaným vydáním kontroluje
+        v krátkém intervalu, dokud nové číslo nedoručí. Stav zapisuje do DAEMON_STATUS_FILE.
+        """
+        missing_vars = missing_config()
+        if missing_vars:
+            logger.error(f"❌ Chybí proměnné prostředí: {', '.join(missing_vars)}")
+            return False
+        
+        stop = threading.Event()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: stop.set())
+        
+        status = {
+            'pid': os.getpid(),
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'checks': 0,
+            'warm_browser': warm_browser
+        }
+        logger.info(f"🕰️ Démon spuštěn (vydání {PUBLICATION_WEEKDAY}. den v týdnu v {PUBLICATION_TIME}, "
+                    f"kontroly po {DAEMON_POLL_INTERVAL.total_seconds() / 60:.0f} min)")
+        
+        try:
+            if warm_browser:
+                try:
+                    self._ensure_browser()
+                except Exception as e:
+                    logger.warning(f"⚠️ Prohlížeč nelze předem spustit: {e}")
+            
+            while not stop.is_set():
+                cycle_start = publication_cycle_start(datetime.now())
+                if self._cycle_delivered(cycle_start):
+                    # Vydání cyklu je doručené - zbývá jen případná fronta
+                    self.drain_outbox()
+                else:
+                    status.update(state='checking', last_check_at=datetime.now().isoformat(timespec='seconds'))
+                    self._write_daemon_status(status)
+                    success = self.run_once(outbox_wait=0)
+                    if success:
+                        self.debug_capture.discard()
+                    else:
+                        self.debug_capture.flush()
+                    status.update(checks=status['checks'] + 1, last_result=success, last_issue=load_state(ISSUE_CACHE_FILE))
+                    self._save_stores()
+                    # Každý průchod má vlastní metriky
+                    self.tracer.write()
+                    self.tracer.reset()
+                
+                next_check = self._next_daemon_check(cycle_start)
+                status.update(
+                    state='sleeping',
+                    cycle_start=cycle_start.isoformat(timespec='seconds'),
+                    delivered=self._cycle_delivered(cycle_start),
+                    next_check_at=next_check.isoformat(timespec='seconds'),
+                    browser=self.driver is not None
+                )
+                self._write_daemon_status(status)
+                logger.info(f"💤 Další kontrola {next_check:%Y-%m-%d %H:%M}")
+                stop.wait(max(0, (next_check - datetime.now()).total_seconds()))
+            
+            logger.info("🛑 Démon ukončen")
+            return True
+        
+        finally:
+            status['state'] = 'stopped'
+            self._write_daemon_status(status)
+            self.close()
+    
+    def _cycle_delivered(self, cycle_start):
+        """Bylo doručeno vydání, které v daném cyklu vychází?
+        
+        Rozhoduje rok a číslo vydání, ne čas doručení - dodatečně doručené starší číslo
+        z fronty nesmí cyklus uzavřít dřív, než přijde nové.
+        """
+        published = (cycle_start + DAEMON_LEAD).date()
+        last_confirmed = load_state(ISSUE_CACHE_FILE)
+        # Potvrzení ze dne vydání mohlo ještě zachytit minulé číslo
+        if last_confirmed and str(last_confirmed.get('confirmed_on', '')) >= published.isoformat():
+            last_confirmed = None
+        expected = predict_issue(published, last_confirmed)
+        with self.ledger.lock:
+            return any(
+                entry.get('delivered_at') and entry.get('year') and entry.get('issue')
+                and (entry['year'], entry['issue']) >= expected
+                for entry in self.ledger.data.values()
+            )
+    
+    def _next_daemon_check(self, cycle_start):
+        """Naplánuje další kontrolu podle stavu cyklu vydání a fronty doručení"""
+        now = datetime.now()
+        next_cycle = cycle_start + timedelta(days=7)
+        if self._cycle_delivered(cycle_start):
+            next_check = next_cycle
+        elif now < cycle_start + DAEMON_WINDOW:
+            next_check = now + DAEMON_POLL_INTERVAL
+        else:
+            next_check = min(now + DAEMON_IDLE_INTERVAL, next_cycle)
+        
+        pending = self.outbox.jobs('pending')
+        if pending:
+            next_attempt = datetime.fromtimestamp(min(job['next_attempt_at'] for job in pending))
+            next_check = min(next_check, max(next_attempt, now))
+        return next_check
+    
+    @staticmethod
+    def _write_daemon_status(status):
+        try:
+            save_state(DAEMON_STATUS_FILE, dict(status, updated_at=datetime.now().isoformat(timespec='seconds')))
+        except OSError as e:
+            logger.warning(f"⚠️ Stav démona nelze zapsat: {e}")
+    
+    def _report_browser_traffic(self):
+        """Vyprázdní performance log prohlížeče a zaloguje souhrn požadavků průchodu"""
+        if not self.driver:
+            return
+        self.resource_blocker.collect(self.driver)
+        if self.resource_blocker.requests:
+            logger.info(f"🚫 Prohlížeč: {self.resource_blocker.summary()}")
+        self.resource_blocker.reset()
+    
+    def _save_stores(self):
+        self.selector_stats.save()
+        self.issue_index.save()
+        self.ledger.save()
+        self.discovery_stats.save()
+    
+    def close(self):
+        """Uloží stav a ukončí prohlížeč i HTTP session"""
+        self._save_stores()
+        self.debug_capture.close()
+        if self.driver:
+            self._report_browser_traffic()
+            self.driver.quit()
+            self.driver = None
+        if self.async_http is not None:
+            self._run_async(self.async_http.aclose())
+            self.async_http = None
+        if self.async_runner is not None:
+            self.async_runner.close()
+            self.async_runner = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        if self.cassette is not None:
+            self.cassette.close()
+        self.tracer.write()
+
+def check_config():
+    """✅ Zkontroluje konfiguraci bez síťových požadavků"""
+    missing_vars = missing_config()
+    if missing_vars:
+        logger.error(f"❌ Chybí proměnné prostředí: {', '.join(missing_vars)}")
+        return False
+    
+    logger.info(f"✅ Konfigurace v pořádku: {len(KINDLE_RECIPIENTS)} příjemců, "
+                f"SMTP {SMTP_HOST}:{SMTP_PORT}, stav v {STATE_DIR}")
+    return True
+
+def print_ledger(years=None):
+    """📒 Vypíše stažená a doručená vydání ze záznamu vydání, volitelně jen pro zadané roky"""
+    entries = sorted(IssueLedger().data.values(), key=lambda entry: (entry.get('year') or 0, entry.get('issue') or 0))
+    for entry in entries:
+        if years and entry.get('year') not in years:
+            continue
+        issue = f"{entry['issue']}/{entry['year']}" if entry.get('year') else '?'
+        print(f"{issue:>8}  {entry.get('issue_id') or '-'}  "
+              f"staženo {entry.get('downloaded_at', '-')}  "
+              f"doručeno {entry.get('delivered_at') or '-'}  {entry.get('file', '')}")
+    return True
 
 def main():
     """Hlavní funkce"""
+    parser = argparse.ArgumentParser(description="Stáhne aktuální číslo Respektu a odešle ho na Kindle")
+    parser.add_argument('--backfill-index', nargs='+', type=int, metavar='ROK',
+                        help="jen doplní index issueId pro zadané roky")
+    parser.add_argument('--archive', nargs='+', type=int, metavar='ROK',
+                        help="stáhne všechna vydání zadaných roků do archivu")
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR,
+                        help=f"adresář pro archiv (výchozí {ARCHIVE_DIR})")
+    parser.add_argument('--workers', type=int, default=ARCHIVE_WORKERS,
+                        help=f"počet souběžných stahování archivu (výchozí {ARCHIVE_WORKERS})")
+    parser.add_argument('--rate', type=float, default=ARCHIVE_RATE,
+                        help=f"max. požadavků za sekundu na host (výchozí {ARCHIVE_RATE:g})")
+    parser.add_argument('--drain-outbox', action='store_true',
+                        help="jen odešle zásilky čekající ve frontě doručení")
+    parser.add_argument('--force', action='store_true',
+                        help="stáhne a odešle vydání, i když už bylo doručeno")
+    parser.add_argument('--daemon', action='store_true',
+                        help="běží trvale a kontroluje nová vydání kolem času vydání")
+    parser.add_argument('--warm-browser', action='store_true',
+                        help="v režimu démona drží spuštěný prohlížeč")
+    parser.add_argument('--daemon-status', action='store_true',
+                        help="vypíše stav běžícího démona")
+    parser.add_argument('--check-config', action='store_true',
+                        help="jen zkontroluje proměnné prostředí")
+    parser.add_argument('--ledger', nargs='*', type=int, metavar='ROK',
+                        help="vypíše stažená a doručená vydání (volitelně jen zadané roky)")
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument('--record', metavar='KAZETA', default=RECORD_CASSETTE,
+                                help="nahraje HTTP provoz běhu do kazety (.json.gz)")
+    cassette_group.add_argument('--replay', metavar='KAZETA', default=REPLAY_CASSETTE,
+                                help="přehraje HTTP provoz z kazety místo sítě (vyžaduje RESPEKT_STATE_DIR)")
+    args = parser.parse_args()
+    
+    setup_logging()
+    
+    # Rychlé příkazy bez sítě - nevytvářejí downloader ani nenačítají těžké moduly
+    if args.check_config:
+        exit(0 if check_config() else 1)
+    if args.ledger is not None:
+        print_ledger(args.ledger)
+        return
+    if args.daemon_status:
+        status = load_state(DAEMON_STATUS_FILE)
+        print(json.dumps(status, ensure_ascii=False, indent=2) if status else "Démon zatím neběžel")
+        return
+    
     logger.info("🌟 Respekt EPUB Downloader v3.0 - Starting...")
     
-    downloader = RespektDownloader()
-    success = downloader.run()
+    cassette = None
+    if args.record and args.replay:
+        parser.error("--record a --replay nejde kombinovat")
+    if args.replay:
+        # Přehraný běh zapisuje do záznamu vydání a fronty - nesmí se míchat se skutečným stavem
+        if os.getenv('RESPEKT_STATE_DIR') is None:
+            logger.error("❌ Přehrávání kazety potřebuje oddělený stav - nastav RESPEKT_STATE_DIR")
+            exit(1)
+        try:
+            cassette = Cassette(args.replay, replaying=True)
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"❌ Kazetu {args.replay} nelze načíst: {e}")
+            exit(1)
+    elif args.record:
+        cassette = Cassette(args.record)
+    
+    downloader = RespektDownloader(cassette)
+    if args.daemon:
+        success = downloader.daemon(warm_browser=args.warm_browser)
+    elif args.backfill_index or args.archive or args.drain_outbox:
+        try:
+            if args.backfill_index:
+                success = downloader.backfill_index(args.backfill_index)
+            elif args.archive:
+                success = downloader.archive_years(args.archive, args.archive_dir, args.workers, args.rate)
+            else:
+                success = downloader.drain_outbox(max_wait=OUTBOX_INLINE_WAIT)
+        finally:
+            downloader.close()
+    else:
+        success = downloader.run(force=args.force)
     
     if not success:
         logger.error("❌ Proces selhal!")